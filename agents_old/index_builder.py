@@ -1,13 +1,22 @@
 import os
-from llama_index.core import VectorStoreIndex, SimpleDirectoryReader
+from llama_index.core import SimpleDirectoryReader, StorageContext
 from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 from llama_index.core import Settings
+from embed_pipeline import build_index_parallel
+from mmap_vector_store import MmapVectorStore
+from embedding_cache import CachedEmbedding
 
 # Optional: Replace this with ERNIE later
-Settings.embed_model = HuggingFaceEmbedding(model_name="BAAI/bge-small-en-v1.5")
+EMBED_MODEL_NAME = "BAAI/bge-small-en-v1.5"
+Settings.embed_model = CachedEmbedding(HuggingFaceEmbedding(model_name=EMBED_MODEL_NAME))
 
-def build_index(data_dir="data"):
+def build_index(data_dir="data", workers=None, batch_size=64):
     documents = SimpleDirectoryReader(data_dir).load_data()
-    index = VectorStoreIndex.from_documents(documents)
+    storage_context = StorageContext.from_defaults(vector_store=MmapVectorStore())
+    # Batched embedding across a process pool; prints chunks/s and tokens/s as it goes
+    index, report = build_index_parallel(
+        documents, EMBED_MODEL_NAME, storage_context, workers=workers, batch_size=batch_size
+    )
     index.storage_context.persist()  # saves to ./storage
-    return index
\ No newline at end of file
+    print(f"📈 {report}")
+    return index
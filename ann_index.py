@@ -0,0 +1,114 @@
+# ann_index.py
+import math
+import os
+
+import numpy as np
+
+ANN_SUFFIX = ".ivf.npz"
+DEFAULT_NPROBE = int(os.getenv("ANN_NPROBE", "8"))
+
+
+def default_nlist(n_rows: int) -> int:
+    # ~4·sqrt(N) lists keeps both the centroid scan and the probed lists small
+    return max(1, min(n_rows, int(4 * math.sqrt(n_rows))))
+
+
+def _chunked_argmax(vectors: np.ndarray, centroids: np.ndarray, chunk: int = 65536) -> np.ndarray:
+    out = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), chunk):
+        out[start:start + chunk] = np.argmax(np.asarray(vectors[start:start + chunk]) @ centroids.T, axis=1)
+    return out
+
+
+class IVFIndex:
+    """Inverted-file ANN index over unit-length rows (cosine == dot product).
+
+    Rows are clustered with spherical k-means; a query scores the centroids,
+    then only the rows in the `nprobe` closest lists. Higher nprobe = better
+    recall, slower queries. Row numbers refer to the matrix the index was
+    built from; rows appended later must be scanned exactly by the caller,
+    or assigned to the existing lists with add().
+    """
+
+    def __init__(self, centroids: np.ndarray, offsets: np.ndarray, rows: np.ndarray, n_rows: int,
+                 nprobe: int = DEFAULT_NPROBE):
+        self.centroids = centroids
+        self.offsets = offsets
+        self.rows = rows
+        self.n_rows = n_rows
+        self.nprobe = nprobe
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, matrix: np.ndarray, nlist: int | None = None, nprobe: int = DEFAULT_NPROBE,
+              iters: int = 10, sample_per_list: int = 256, seed: int = 0) -> "IVFIndex":
+        n = len(matrix)
+        if n == 0:
+            raise ValueError("Cannot build an ANN index over an empty store")
+        nlist = min(nlist or default_nlist(n), n)
+        rng = np.random.default_rng(seed)
+
+        # Train on a sample; assignment of the full matrix happens once at the end
+        sample_size = min(n, nlist * sample_per_list)
+        sample = np.asarray(matrix[np.sort(rng.choice(n, sample_size, replace=False))], dtype=np.float32)
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+        for _ in range(iters):
+            assign = _chunked_argmax(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            counts = np.bincount(assign, minlength=nlist)
+            empty = counts == 0
+            if empty.any():
+                # Re-seed empty lists from random sample points
+                sums[empty] = sample[rng.choice(sample_size, int(empty.sum()), replace=False)]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            centroids = (sums / norms).astype(np.float32)
+
+        assign = _chunked_argmax(matrix, centroids)
+        rows = np.argsort(assign, kind="stable").astype(np.int64)
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(assign, minlength=nlist))
+        return cls(centroids, offsets, rows, n_rows=n, nprobe=nprobe)
+
+    def add(self, vectors: np.ndarray, row_numbers) -> "IVFIndex":
+        """Copy of the index with `row_numbers` (new or re-embedded rows) filed under their nearest centroid.
+
+        The centroids stay as they are; rebuild once the matrix has grown enough for them to drift.
+        """
+        row_numbers = np.asarray(row_numbers, dtype=np.int64)
+        lists = np.repeat(np.arange(self.nlist), np.diff(self.offsets))
+        keep = ~np.isin(self.rows, row_numbers)
+        all_lists = np.concatenate([lists[keep], _chunked_argmax(np.asarray(vectors, dtype=np.float32), self.centroids)])
+        all_rows = np.concatenate([self.rows[keep], row_numbers])
+        order = np.argsort(all_lists, kind="stable")
+        offsets = np.zeros(self.nlist + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(all_lists, minlength=self.nlist))
+        n_rows = max(self.n_rows, int(row_numbers.max()) + 1) if len(row_numbers) else self.n_rows
+        return IVFIndex(self.centroids, offsets, all_rows[order], n_rows=n_rows, nprobe=self.nprobe)
+
+    def candidates(self, query: np.ndarray, nprobe: int | None = None) -> np.ndarray:
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        centroid_scores = self.centroids @ query
+        probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        return np.concatenate([self.rows[self.offsets[c]:self.offsets[c + 1]] for c in probe])
+
+    def save(self, path: str):
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, centroids=self.centroids, offsets=self.offsets, rows=self.rows,
+                 n_rows=np.int64(self.n_rows), nprobe=np.int64(self.nprobe))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, nprobe: int | None = None) -> "IVFIndex":
+        # ANN_NPROBE in the environment overrides the value the index was built with
+        if nprobe is None and "ANN_NPROBE" in os.environ:
+            nprobe = DEFAULT_NPROBE
+        with np.load(path) as data:
+            return cls(
+                data["centroids"], data["offsets"], data["rows"], int(data["n_rows"]),
+                nprobe=nprobe or int(data["nprobe"]),
+            )
@@ -0,0 +1,139 @@
+# batch_scraper.py
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from html_extract import extract_text
+from page_cache import PageCache, default_page_cache
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+}
+
+
+def normalize_url(url: str) -> str:
+    # Clean and validate URL
+    url = url.strip().split()[0]
+    if not url.startswith("http"):
+        url = "https://" + url
+    return url
+
+
+@dataclass
+class ScrapeResult:
+    url: str
+    content: str = ""
+    status: Optional[int] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0  # seconds, including any rate-limit wait
+    source: Optional[str] = None  # page cache outcome, see page_cache.CachedPage
+    timings: dict = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class DomainRateLimiter:
+    """Spaces out request starts to the same host by at least min_interval seconds."""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._next_slot: dict[str, float] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def wait(self, host: str):
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            delay = self._next_slot.get(host, 0.0) - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_slot[host] = time.monotonic() + self.min_interval
+
+
+async def scrape_many_async(urls: list, concurrency: int = 10, per_host: int = 2, min_interval: float = 0.5,
+                            timeout: float = 15.0, extract: Callable[[bytes], str] = extract_text,
+                            client: Optional[httpx.AsyncClient] = None, cache: Optional[PageCache] = None) -> list:
+    """Fetch many URLs concurrently and return one ScrapeResult per input URL, in input order."""
+    limiter = DomainRateLimiter(min_interval)
+    host_slots: dict[str, asyncio.Semaphore] = {}
+    global_slots = asyncio.Semaphore(concurrency)
+    cache = cache or default_page_cache()
+    own_client = client is None
+    if own_client:
+        client = httpx.AsyncClient(
+            headers=HEADERS, timeout=timeout, follow_redirects=True,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+
+    async def fetch(raw_url: str) -> ScrapeResult:
+        started = time.perf_counter()
+        try:
+            url = normalize_url(raw_url)
+        except IndexError:
+            return ScrapeResult(url=raw_url, error="empty URL")
+        result = ScrapeResult(url=url)
+        host = urlsplit(url).netloc.lower()
+        slots = host_slots.setdefault(host, asyncio.Semaphore(per_host))
+        try:
+            page = await asyncio.to_thread(cache.lookup, url)
+            if cache.offline or (page is not None and time.time() - page["fetched_at"] < cache.max_age):
+                # Served from disk: no connection slot or rate-limit wait needed
+                page = await cache.afetch(client, url)
+            else:
+                # Wait on the host first: a rate-limited host must not sit on global slots other hosts could use
+                async with slots:
+                    await limiter.wait(host)
+                    async with global_slots:
+                        result.timings["queued"] = time.perf_counter() - started
+                        page = await cache.afetch(client, url)
+                        result.timings["fetch"] = time.perf_counter() - started - result.timings["queued"]
+            result.status = page.status
+            result.source = page.source
+            # Parse off the event loop so big pages don't stall the other downloads
+            parse_started = time.perf_counter()
+            result.content = await asyncio.to_thread(extract, page.content)
+            result.timings["parse"] = time.perf_counter() - parse_started
+        except httpx.HTTPStatusError as e:
+            result.status = e.response.status_code
+            result.error = f"{type(e).__name__}: {e}"
+        except httpx.HTTPError as e:
+            result.error = f"{type(e).__name__}: {e}"
+        except Exception as e:
+            result.error = f"Scraping error: {e}"
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    try:
+        return await asyncio.gather(*(fetch(u) for u in urls))
+    finally:
+        if own_client:
+            await client.aclose()
+
+
+def scrape_many(urls: list, **kwargs) -> list:
+    # Sync entry point for tools; crewai may already be running an event loop in this thread
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(scrape_many_async(urls, **kwargs))
+
+    results: list = []
+    worker = threading.Thread(target=lambda: results.extend(asyncio.run(scrape_many_async(urls, **kwargs))))
+    worker.start()
+    worker.join()
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+
+    for r in scrape_many(sys.argv[1:] or ["https://www.mindful.org/what-is-mindfulness/"]):
+        status = "✅" if r.ok else f"❌ {r.error}"
+        print(f"{status} {r.url} — {r.elapsed:.2f}s, {len(r.content)} chars ({r.source or 'no page'})")
+    print("📦 Page cache:", default_page_cache().stats())
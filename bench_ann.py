@@ -0,0 +1,88 @@
+# bench_ann.py
+import argparse
+import time
+
+import numpy as np
+
+from ann_index import IVFIndex, default_nlist
+
+# Usage:
+#   python bench_ann.py --persist-dir storage            # benchmark the real store
+#   python bench_ann.py --synthetic 100000 --dim 384     # benchmark clustered random vectors
+
+
+def load_matrix(args) -> np.ndarray:
+    if args.synthetic:
+        # Clustered data is closer to real embeddings than uniform noise (and harder for IVF to fake)
+        rng = np.random.default_rng(args.seed)
+        centers = rng.standard_normal((max(1, args.synthetic // 500), args.dim)).astype(np.float32)
+        matrix = centers[rng.integers(0, len(centers), args.synthetic)]
+        matrix += 0.5 * rng.standard_normal(matrix.shape).astype(np.float32)
+    else:
+        from mmap_vector_store import MmapVectorStore
+        matrix = MmapVectorStore.from_persist_dir(args.persist_dir)._vectors()
+        if matrix is None:
+            raise SystemExit(f"No vectors in {args.persist_dir}; run build_index.py first")
+    matrix = np.asarray(matrix, dtype=np.float32)
+    return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+
+def percentile_ms(samples: list, p: float) -> float:
+    return float(np.percentile(samples, p) * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall@k and latency of the IVF index vs the exact scan")
+    parser.add_argument("--persist-dir", default="./storage")
+    parser.add_argument("--synthetic", type=int, default=0, help="use N synthetic vectors instead of a store")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=None)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    matrix = load_matrix(args)
+    n = len(matrix)
+    rng = np.random.default_rng(args.seed + 1)
+    # Perturbed copies of stored rows: realistic queries that have true neighbours in the set
+    queries = matrix[rng.integers(0, n, args.queries)] + 0.1 * rng.standard_normal((args.queries, matrix.shape[1]))
+    queries = (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype(np.float32)
+    k = min(args.k, n)
+
+    started = time.perf_counter()
+    ann = IVFIndex.build(matrix, nlist=args.nlist or default_nlist(n))
+    print(f"📦 {n} vectors x {matrix.shape[1]} dims · {ann.nlist} lists · built in {time.perf_counter() - started:.2f}s\n")
+
+    exact_ids, exact_times = [], []
+    for q in queries:
+        t = time.perf_counter()
+        scores = matrix @ q
+        top = np.argpartition(-scores, k - 1)[:k]
+        exact_times.append(time.perf_counter() - t)
+        exact_ids.append(set(top.tolist()))
+
+    print(f"{'method':<14}{'recall@' + str(k):>10}{'p50 ms':>10}{'p95 ms':>10}{'scanned':>10}")
+    print(f"{'exact':<14}{1.0:>10.3f}{percentile_ms(exact_times, 50):>10.3f}"
+          f"{percentile_ms(exact_times, 95):>10.3f}{n:>10}")
+
+    for nprobe in args.nprobe:
+        if nprobe > ann.nlist:
+            continue
+        hits, times, scanned = 0, [], 0
+        for q, truth in zip(queries, exact_ids):
+            t = time.perf_counter()
+            rows = np.sort(ann.candidates(q, nprobe=nprobe))
+            scores = matrix[rows] @ q
+            kk = min(k, len(rows))
+            top = rows[np.argpartition(-scores, kk - 1)[:kk]]
+            times.append(time.perf_counter() - t)
+            hits += len(truth & set(top.tolist()))
+            scanned += len(rows)
+        print(f"{'ivf nprobe=' + str(nprobe):<14}{hits / (k * len(queries)):>10.3f}"
+              f"{percentile_ms(times, 50):>10.3f}{percentile_ms(times, 95):>10.3f}{scanned // len(queries):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# bench_html_extract.py
+import argparse
+import glob
+import os
+import statistics
+import time
+
+from html_extract import PROFILES, etree, extract_text_bs4, extract_text_lxml
+
+# Usage:
+#   python bench_html_extract.py                          # saved pages in fixtures/html
+#   python bench_html_extract.py page1.html page2.html --profile article --repeat 50
+
+
+def time_ms(fn, html: bytes, profile, repeat: int) -> tuple[float, str]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        text = fn(html, profile)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000, text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BeautifulSoup vs streaming lxml text extraction")
+    parser.add_argument("files", nargs="*", help="HTML files (default: fixtures/html/*.html)")
+    parser.add_argument("--profile", choices=sorted(PROFILES), nargs="+", default=sorted(PROFILES))
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if etree is None:
+        raise SystemExit("lxml is not installed; pip install lxml to benchmark the streaming path")
+    files = args.files or sorted(glob.glob(os.path.join(os.path.dirname(__file__) or ".", "fixtures", "html", "*.html")))
+    if not files:
+        raise SystemExit("No HTML files to benchmark")
+
+    print(f"{'page':<24}{'profile':<12}{'KB':>8}{'bs4 ms':>10}{'lxml ms':>10}{'speedup':>9}  same")
+    for path in files:
+        with open(path, "rb") as f:
+            html = f.read()
+        for name in args.profile:
+            profile = PROFILES[name]
+            bs4_ms, bs4_text = time_ms(extract_text_bs4, html, profile, args.repeat)
+            lxml_ms, lxml_text = time_ms(extract_text_lxml, html, profile, args.repeat)
+            print(f"{os.path.basename(path)[:23]:<24}{name:<12}{len(html) / 1024:>8.0f}{bs4_ms:>10.2f}"
+                  f"{lxml_ms:>10.2f}{bs4_ms / lxml_ms:>8.1f}x  {'✅' if bs4_text == lxml_text else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,51 @@
 # build_index.py
-import os
-from llama_index.core import VectorStoreIndex, SimpleDirectoryReader
+import argparse
+from llama_index.core import SimpleDirectoryReader, StorageContext
 from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 from llama_index.llms.ollama import Ollama
 from llama_index.core import Settings
+from mmap_vector_store import MmapVectorStore
+from incremental_index import refresh_index
+from embed_pipeline import build_index_parallel
+from embedding_cache import CachedEmbedding
 
-# 1. Set up open-source models
-Settings.llm = Ollama(model="llama3")  # You must have Ollama + LLaMA3 installed
-Settings.embed_model = HuggingFaceEmbedding(model_name="BAAI/bge-small-en-v1.5")
+EMBED_MODEL_NAME = "BAAI/bge-small-en-v1.5"
 
-# 2. Load all text/markdown/pdf files from the 'data' folder
-documents = SimpleDirectoryReader("data").load_data()
+# The guard matters: the embedding workers are spawned processes that re-import this module
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the local vector index from ./data")
+    parser.add_argument("--incremental", action="store_true", help="only embed new/changed files")
+    parser.add_argument("--workers", type=int, default=None, help="embedding processes (default: all cores)")
+    parser.add_argument("--batch-size", type=int, default=64, help="chunks per embedding batch")
+    parser.add_argument("--ann", action="store_true", help="also build an IVF approximate-NN index")
+    parser.add_argument("--nlist", type=int, default=None, help="IVF lists (default: ~4*sqrt(chunks))")
+    parser.add_argument("--nprobe", type=int, default=8, help="IVF lists scanned per query (recall vs speed)")
+    args = parser.parse_args()
 
-# 3. Build and save the vector index
-index = VectorStoreIndex.from_documents(documents)
-index.storage_context.persist()
+    # 1. Set up open-source models
+    Settings.llm = Ollama(model="llama3")  # You must have Ollama + LLaMA3 installed
+    Settings.embed_model = CachedEmbedding(HuggingFaceEmbedding(model_name=EMBED_MODEL_NAME))
 
-print("✅ Index created and saved to /storage")
\ No newline at end of file
+    if args.incremental:
+        # 2+3. Only embed files whose content hash changed since the last run (see incremental_index.py)
+        stats = refresh_index("data", "./storage")
+        print(f"✅ Index refreshed in /storage: {stats}")
+        print(f"🗃️  Embedding cache: {Settings.embed_model.cache.stats()}")
+    else:
+        # 2. Load all text/markdown/pdf files from the 'data' folder
+        documents = SimpleDirectoryReader("data").load_data()
+
+        # 3. Embed on all cores and save the vector index (float32 matrix file, see mmap_vector_store.py)
+        storage_context = StorageContext.from_defaults(vector_store=MmapVectorStore())
+        index, report = build_index_parallel(
+            documents, EMBED_MODEL_NAME, storage_context, workers=args.workers, batch_size=args.batch_size
+        )
+        index.storage_context.persist()
+
+        print(f"📈 {report}")
+        print("✅ Index created and saved to /storage")
+
+    if args.ann:
+        # Saved next to the matrix; query_index.py and LocalDocQueryTool pick it up automatically
+        ann = MmapVectorStore.from_persist_dir("./storage").build_ann(nlist=args.nlist, nprobe=args.nprobe)
+        print(f"✅ ANN index built: {ann.nlist} lists, nprobe={ann.nprobe} (see bench_ann.py for recall)")
@@ -0,0 +1,134 @@
+# cort_engine.py
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from ollama_client import OllamaClient, get_client, user_message
+
+# Chain of Recursive Thoughts: draft an answer, then repeatedly generate alternatives
+# and let the model pick the best one. Runs against the local Ollama server.
+CORT_MODEL = os.getenv("CORT_MODEL", "qwen:7b")
+CORT_ALTERNATIVES = int(os.getenv("CORT_ALTERNATIVES", "3"))
+CORT_MAX_ROUNDS = int(os.getenv("CORT_MAX_ROUNDS", "5"))
+# Stop once the best answer survived this many rounds in a row, or the judge scores it this high (0 = off)
+CORT_PATIENCE = int(os.getenv("CORT_PATIENCE", "1"))
+CORT_SCORE_THRESHOLD = int(os.getenv("CORT_SCORE_THRESHOLD", "9"))
+
+
+@dataclass
+class CoRTResult:
+    answer: str
+    rounds: int = 0
+    calls: int = 0
+    planned_rounds: int = 0
+    score: Optional[int] = None
+    stopped: str = "planned_rounds"  # or "unchanged" / "score"
+    seconds: float = 0.0
+    history: list = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return {"answer": self.answer, "rounds": self.rounds, "planned_rounds": self.planned_rounds,
+                "calls": self.calls, "score": self.score, "stopped": self.stopped,
+                "seconds": round(self.seconds, 2), "history": self.history}
+
+
+class CoRTEngine:
+    def __init__(self, model: str = CORT_MODEL, client: Optional[OllamaClient] = None,
+                 alternatives: int = CORT_ALTERNATIVES, max_rounds: int = CORT_MAX_ROUNDS,
+                 patience: int = CORT_PATIENCE, score_threshold: int = CORT_SCORE_THRESHOLD):
+        self.model = model
+        self.client = client or get_client()
+        self.alternatives = alternatives
+        self.max_rounds = max_rounds
+        self.patience = patience
+        self.score_threshold = score_threshold
+        # Threads, not asyncio: the client's per-model semaphore already caps what reaches Ollama,
+        # and the worker runs several queries on separate threads that share this engine
+        self._pool = ThreadPoolExecutor(max_workers=max(2, alternatives * 2), thread_name_prefix="cort-alt")
+
+    def _ask(self, prompt: str, temperature: float) -> str:
+        return self.client.chat(self.model, user_message(prompt), options={"temperature": temperature}).strip()
+
+    def _rounds_for(self, prompt: str) -> int:
+        reply = self._ask(
+            f'Given this message: "{prompt}"\n\n'
+            "How many rounds of iterative thinking (1-5) would be optimal to generate the best response? "
+            "Respond with just a number.",
+            temperature=0.3,
+        )
+        match = re.search(r"\d+", reply)
+        return max(1, min(self.max_rounds, int(match.group()) if match else 3))
+
+    def _alternative_prompt(self, prompt: str, current: str) -> str:
+        return (
+            f"Original message: {prompt}\n\nCurrent response: {current}\n\n"
+            "Generate an alternative response that might be better. "
+            "Be creative and consider different approaches.\nAlternative response:"
+        )
+
+    def _pick_best(self, prompt: str, current: str, alternatives: list) -> tuple[int, Optional[int], str]:
+        # Returns (index, score, reason) where index 0 is the current answer and 1..n the alternatives
+        listing = "\n\n".join(f"{i}. {alt}" for i, alt in enumerate(alternatives, 1))
+        reply = self._ask(
+            f"Original message: {prompt}\n\nEvaluate these responses and choose the best one:\n\n"
+            f"Current best: {current}\n\nAlternatives:\n{listing}\n\n"
+            "Which response best addresses the original message? Consider accuracy, clarity, and completeness. "
+            f"First, respond with ONLY 'current' or a number (1-{len(alternatives)}). "
+            "On the second line, rate the chosen response from 1 to 10 with just a number. "
+            "Then on a new line, explain your choice in one sentence.",
+            temperature=0.2,
+        )
+        lines = [line.strip() for line in reply.splitlines() if line.strip()] or [""]
+        match = re.search(r"\d+", lines[0])
+        choice = int(match.group()) if match and "current" not in lines[0].lower() else 0
+        score_match = re.fullmatch(r"(?:score:?\s*)?(\d+)(?:\s*/\s*10)?\.?", lines[1].lower()) if len(lines) > 1 else None
+        score = min(10, int(score_match.group(1))) if score_match else None
+        reason = " ".join(lines[2:] if score_match else lines[1:])
+        return (choice if 0 <= choice <= len(alternatives) else 0), score, reason
+
+    def think(self, prompt: str, on_event: Optional[Callable[[dict], None]] = None) -> CoRTResult:
+        emit = on_event or (lambda event: None)
+        started = time.perf_counter()
+
+        # The first draft and the round planning don't depend on each other
+        draft = self._pool.submit(self._ask, prompt, 0.7)
+        planned = self._pool.submit(self._rounds_for, prompt)
+        current, rounds = draft.result(), planned.result()
+        result = CoRTResult(answer=current, calls=2, planned_rounds=rounds)
+        emit({"event": "initial", "answer": current, "planned_rounds": rounds})
+
+        unchanged = 0
+        for round_no in range(1, rounds + 1):
+            futures = [
+                self._pool.submit(self._ask, self._alternative_prompt(prompt, current), 0.7 + i * 0.1)
+                for i in range(self.alternatives)
+            ]
+            alternatives = [f.result() for f in futures]
+            best, score, reason = self._pick_best(prompt, current, alternatives)
+            result.calls += len(alternatives) + 1
+            if best:
+                current = alternatives[best - 1]
+                unchanged = 0
+            else:
+                unchanged += 1
+            result.score = score
+            step = {"round": round_no, "alternatives": alternatives, "chosen": best, "score": score, "reason": reason}
+            result.history.append(step)
+            emit({"event": "round", **step, "answer": current})
+
+            if round_no == rounds:
+                break
+            if self.score_threshold and score is not None and score >= self.score_threshold:
+                result.stopped = "score"
+                break
+            if self.patience and unchanged >= self.patience:
+                result.stopped = "unchanged"
+                break
+
+        result.answer = current
+        result.rounds = len(result.history)
+        result.seconds = time.perf_counter() - started
+        return result
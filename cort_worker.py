@@ -0,0 +1,182 @@
+# cort_worker.py
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, Optional
+
+# Protocol: JSON lines. Requests on stdin: {"id": ..., "prompt": ..., "model": optional}.
+# Replies on stdout: {"event": "ready"} once, then per request any number of
+# {"id", "event": "initial" | "round", ...} followed by {"id", "event": "result" | "error", ...}.
+CORT_WORKER_CONCURRENCY = int(os.getenv("CORT_WORKER_CONCURRENCY", "2"))
+CORT_TIMEOUT = float(os.getenv("CORT_TIMEOUT", "900"))  # max seconds between two events of one request
+
+
+class CoRTError(Exception):
+    pass
+
+
+# --------------------
+# Worker side
+# --------------------
+
+def serve(concurrency: int = CORT_WORKER_CONCURRENCY):
+    # Keep the real stdout for the protocol; anything else that prints goes to stderr
+    protocol = os.fdopen(os.dup(1), "w", buffering=1)
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+
+    from cort_engine import CoRTEngine
+
+    # One engine (and its thread pool) per model, shared by every query for that model
+    engines: dict = {}
+    engines_lock = threading.Lock()
+    write_lock = threading.Lock()
+
+    def engine_for(model: Optional[str]) -> CoRTEngine:
+        with engines_lock:
+            if model not in engines:
+                engines[model] = CoRTEngine(model=model) if model else CoRTEngine()
+            return engines[model]
+
+    def send(message: dict):
+        with write_lock:
+            protocol.write(json.dumps(message) + "\n")
+            protocol.flush()
+
+    def run(request: dict):
+        request_id = request.get("id")
+        try:
+            result = engine_for(request.get("model")).think(request["prompt"], on_event=lambda e: send({"id": request_id, **e}))
+            send({"id": request_id, "event": "result", **result.as_dict()})
+            print(f"🔁 CoRT: {result.rounds}/{result.planned_rounds} rounds, {result.calls} calls, "
+                  f"{result.seconds:.1f}s (stopped: {result.stopped})")
+        except Exception as e:
+            send({"id": request_id, "event": "error", "error": str(e)})
+
+    # The executor's queue is the request queue: at most `concurrency` queries think at once
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="cort") as pool:
+        send({"event": "ready"})
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError:
+                send({"event": "error", "error": f"bad request line: {line[:200]!r}"})
+                continue
+            pool.submit(run, request)
+
+
+# --------------------
+# Client side (used by cort_tool.CoRTTool)
+# --------------------
+
+class CoRTWorkerClient:
+    """Starts cort_worker.py once and multiplexes concurrent queries over its stdin/stdout."""
+
+    def __init__(self, concurrency: int = CORT_WORKER_CONCURRENCY, timeout: float = CORT_TIMEOUT):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._proc: Optional[subprocess.Popen] = None
+        self._pending: dict[str, queue.Queue] = {}
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> subprocess.Popen:
+        with self._lock:
+            if self._proc is not None and self._proc.poll() is None:
+                return self._proc
+            proc = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), "--concurrency", str(self.concurrency)],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=None,  # worker logs go to our stderr
+                text=True, bufsize=1, cwd=os.path.dirname(os.path.abspath(__file__)),
+            )
+            ready = proc.stdout.readline()
+            if not ready or json.loads(ready).get("event") != "ready":
+                proc.kill()
+                raise CoRTError("CoRT worker failed to start")
+            threading.Thread(target=self._read_loop, args=(proc,), name="cort-reader", daemon=True).start()
+            self._proc = proc
+            return proc
+
+    def _read_loop(self, proc: subprocess.Popen):
+        for line in proc.stdout:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            with self._lock:
+                waiting = self._pending.get(message.get("id"))
+            if waiting is not None:
+                waiting.put(message)
+        # Worker died: fail everything still in flight instead of hanging
+        with self._lock:
+            waiting = list(self._pending.values())
+        for q in waiting:
+            q.put({"event": "error", "error": f"CoRT worker exited with code {proc.wait()}"})
+
+    def stream(self, prompt: str, model: Optional[str] = None) -> Iterator[dict]:
+        proc = self._ensure_started()
+        request_id = uuid.uuid4().hex
+        events: queue.Queue = queue.Queue()
+        with self._lock:
+            self._pending[request_id] = events
+            proc.stdin.write(json.dumps({"id": request_id, "prompt": prompt, "model": model}) + "\n")
+            proc.stdin.flush()
+        try:
+            while True:
+                try:
+                    event = events.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise CoRTError(f"CoRT worker gave no progress for {self.timeout:.0f}s")
+                yield event
+                if event["event"] in ("result", "error"):
+                    return
+        finally:
+            with self._lock:
+                self._pending.pop(request_id, None)
+
+    def ask(self, prompt: str, model: Optional[str] = None,
+            on_event: Optional[Callable[[dict], None]] = None) -> dict:
+        for event in self.stream(prompt, model=model):
+            if event["event"] == "error":
+                raise CoRTError(event["error"])
+            if event["event"] == "result":
+                return event
+            if on_event:
+                on_event(event)
+        raise CoRTError("CoRT worker ended the stream without a result")
+
+    def close(self):
+        with self._lock:
+            proc, self._proc = self._proc, None
+        if proc is not None and proc.poll() is None:
+            proc.stdin.close()  # worker finishes queued queries, then exits
+            try:
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+_worker: Optional[CoRTWorkerClient] = None
+_worker_lock = threading.Lock()
+
+
+def get_worker() -> CoRTWorkerClient:
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = CoRTWorkerClient()
+        return _worker
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Long-lived CoRT worker speaking JSON lines on stdin/stdout")
+    parser.add_argument("--concurrency", type=int, default=CORT_WORKER_CONCURRENCY)
+    serve(parser.parse_args().concurrency)
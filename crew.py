@@ -1,7 +1,8 @@
-from crewai import Agent, Task, Crew, LLM
+from crewai import Agent, Task, Crew
+from ollama_client import crew_llm
 
 # Step 1: Define the LLM
-llm = LLM(model="ollama/qwen:7b", base_url="http://localhost:11434")
+llm = crew_llm("qwen:7b")
 
 # Step 2: Create the Agent (✅ includes required `backstory`)
 qwen_agent = Agent(
@@ -6,12 +6,15 @@ from crewai import Agent, Task, Crew
 from tools import scrape_tool
 
 # ✅ Use ChatOllama directly — no CrewAI LLM wrapper
-from langchain_ollama import ChatOllama
+from ollama_client import chat_ollama
+from llm_cache import install_langchain_cache
 
-# Connect directly to Ollama
-llm = ChatOllama(
-    model="phi3:mini",
-    base_url="http://localhost:11434",  # Where Ollama is running
+# Opt-in response cache (LLM_CACHE=1) for repeat runs; sampled calls need LLM_CACHE_SAMPLED=1 too
+llm_cache = install_langchain_cache()
+
+# Connect directly to Ollama (base URL comes from ollama_client / OLLAMA_BASE_URL)
+llm = chat_ollama(
+    "phi3:mini",
     temperature=0.7,
     num_predict=1024,
     repeat_last_n=64
@@ -62,4 +65,6 @@ if __name__ == "__main__":
     print("🐝 Qween Bee says: Creating your mindful tech blog...\n")
     result = crew.kickoff()
     print("\n📝 Final Output:")
-    print(result)
\ No newline at end of file
+    print(result)
+    if llm_cache is not None:
+        print(f"\n🗃️  LLM cache: {llm_cache.stats()}")
\ No newline at end of file
@@ -1,37 +1,36 @@
 # crew_mindful.py
-from langchain_ollama import ChatOllama
+from ollama_client import get_client
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-import requests
-from bs4 import BeautifulSoup
+from html_extract import PARAGRAPHS, extract_text
+from page_cache import fetch_page
 import os
 
 # Disable telemetry
 os.environ["LANGCHAIN_TRACING_V2"] = "false"
 
-# Use phi3:mini
-llm = ChatOllama(
-    model="phi3:mini",
-    base_url="http://localhost:11434",
-    temperature=0.7
-)
+# Use phi3:mini, streamed token by token through the shared Ollama client
+MODEL = "phi3:mini"
+OPTIONS = {"temperature": 0.7}
+
+
+def stream_stage(prompt_value):
+    # Print tokens as they arrive instead of waiting for the full completion
+    messages = [{"role": "user", "content": m.content} for m in prompt_value.to_messages()]
+    stream = get_client().stream_chat(MODEL, messages, options=OPTIONS)
+    parts = []
+    for token in stream:
+        parts.append(token)
+        print(token, end="", flush=True)
+    print(f"\n⏱️  {stream.stats}")
+    return "".join(parts)
 
 # Simple scraper
 def scrape_mindful_site():
     url = "https://www.mindful.org/what-is-mindfulness/"
     headers = {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"}
     try:
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        for element in soup(["script", "style", "nav", "footer", "aside"]):
-            element.decompose()
-        content = "\n".join([
-            p.get_text(strip=True) 
-            for p in soup.find_all("p") 
-            if len(p.get_text(strip=True)) > 50
-        ])
-        return content[:4000]
+        page = fetch_page(url, headers=headers, timeout=15)
+        return extract_text(page.content, PARAGRAPHS)
     except Exception as e:
         return f"Error: {str(e)}"
 
@@ -55,9 +54,9 @@ Article:
 
 Return only the habit — 1-2 sentences.
 """)
-    habit_chain = habit_prompt | llm | StrOutputParser()
-    habit = habit_chain.invoke({"content": content})
-    print("✅ Habit:", habit, "\n")
+    print("✅ Habit: ", end="", flush=True)
+    habit = stream_stage(habit_prompt.invoke({"content": content}))
+    print()
     
     # Step 3: Write blog
     print("✍️ Writing blog...")
@@ -68,13 +67,14 @@ Habit: {habit}
 
 Use markdown. Conversational tone.
 """)
-    blog_chain = blog_prompt | llm | StrOutputParser()
-    blog = blog_chain.invoke({"habit": habit})
     print("✅ Blog Post:\n")
-    print(blog)
+    blog = stream_stage(blog_prompt.invoke({"habit": habit}))
     
     # Step 4: Save
     os.makedirs("outputs", exist_ok=True)
     with open("outputs/mindful_blog.md", "w") as f:
         f.write(f"# One Small Habit to Use Tech More Mindfully\n\n{blog}")
-    print("\n💾 Saved to outputs/mindful_blog.md")
\ No newline at end of file
+    print("\n💾 Saved to outputs/mindful_blog.md")
+    # LLM_CACHE=1 (plus LLM_CACHE_SAMPLED=1 for these temperature 0.7 stages) replays identical prompts
+    if get_client().cache is not None:
+        print(f"🗃️  LLM cache: {get_client().cache.stats()}")
\ No newline at end of file
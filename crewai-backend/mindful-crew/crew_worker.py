@@ -0,0 +1,68 @@
+# crew_worker.py
+import importlib
+import json
+import os
+import runpy
+import sys
+import traceback
+
+# Long-lived crew process for tauri_backend's worker pool. Reads one JSON job per line
+# ({"id": ..., "topic": ..., "cwd": optional run directory}) on stdin, runs the crew script as if it
+# were `python simple_crew.py <topic>` from that directory, then ends the job with a JOB_DONE line
+# on stderr and stdout.
+JOB_DONE = "\x1e__CREW_JOB_DONE__"
+CREW_SCRIPT = os.getenv("CREW_SCRIPT", "simple_crew.py")
+WARM_MODULES = ("crewai", "litellm", "langchain_community.chat_models")
+
+
+def warm_up():
+    # The whole point of the pool: pay these imports once per worker, not once per run
+    for name in WARM_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            print(f"⚠️ Crew worker could not pre-import {name}: {e}", file=sys.stderr)
+
+
+def run_job(job: dict, script: str) -> int:
+    home = os.getcwd()
+    sys.argv = [script, job["topic"]]
+    try:
+        # Relative output paths (outputs/blog.md) then land in the run's own directory
+        if job.get("cwd"):
+            os.chdir(job["cwd"])
+        runpy.run_path(script, run_name="__main__")
+        return 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    except BaseException:
+        traceback.print_exc()
+        return 1
+    finally:
+        os.chdir(home)
+
+
+def main():
+    # Started with cwd=REPO_ROOT; make root modules importable like `python simple_crew.py` would
+    sys.path.insert(0, os.getcwd())
+    script = os.path.abspath(CREW_SCRIPT)
+    warm_up()
+    # Marks the end of start-up noise on stderr so it isn't blamed on the first job
+    sys.stderr.write(JOB_DONE + "\n")
+    sys.stderr.flush()
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        job = json.loads(line)
+        returncode = run_job(job, script)
+        sys.stderr.write(JOB_DONE + "\n")
+        sys.stderr.flush()
+        sys.stdout.write(JOB_DONE + json.dumps({"id": job.get("id"), "returncode": returncode}) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,39 @@
 # tauri_backend.py
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 import asyncio
+import functools
+import gzip
+import hashlib
+import json
+import math
 import os
+import re
+import shutil
 import sqlite3
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
+import numpy as np
+
+# Optional: orjson encodes responses faster, brotli compresses them smaller than gzip
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 # 🐝 Qween Bee's Fix: Force litellm to accept Ollama models
 import litellm
 from functools import wraps
@@ -36,6 +61,36 @@ OUTPUTS_DIR = REPO_ROOT / "outputs"
 BLOG_PATH = OUTPUTS_DIR / "blog.md"
 LINKEDIN_PATH = OUTPUTS_DIR / "linkedin_post.md"
 MEMORY_DB_PATH = OUTPUTS_DIR / "memory.db"
+# Each crew run gets outputs/jobs/<job id>/ as its working directory
+JOBS_DIR = OUTPUTS_DIR / "jobs"
+# SQLite work runs on this many threads, each holding one long-lived connection
+MEMORY_DB_THREADS = int(os.getenv("MEMORY_DB_THREADS", "4"))
+# posts_fts tokenizer: unicode61 (default), porter (stemming) or trigram (substring matching, SQLite >= 3.34).
+# Changing it rebuilds the FTS index on the next startup.
+MEMORY_FTS_TOKENIZER = os.getenv("MEMORY_FTS_TOKENIZER", "unicode61")
+# "hybrid" search ranking halves a match's relevance for every this-many days of age
+MEMORY_SEARCH_HALF_LIFE_DAYS = float(os.getenv("MEMORY_SEARCH_HALF_LIFE_DAYS", "30"))
+# Posts are embedded in the background for /memory/semantic-search; MEMORY_SEMANTIC=0 turns that off
+MEMORY_SEMANTIC = os.getenv("MEMORY_SEMANTIC", "1") == "1"
+MEMORY_EMBED_MODEL = os.getenv("MEMORY_EMBED_MODEL", "BAAI/bge-small-en-v1.5")
+# Above this many vectors semantic search probes an IVF index instead of scoring every post
+MEMORY_ANN_MIN_ROWS = int(os.getenv("MEMORY_ANN_MIN_ROWS", "5000"))
+# New vectors join the nearest existing IVF list; k-means is redone once the rows grow by this factor
+MEMORY_ANN_REBUILD_GROWTH = float(os.getenv("MEMORY_ANN_REBUILD_GROWTH", "1.5"))
+# Warm crew processes (one run each at a time) and how many more runs may wait for one before we answer 429.
+# A single local Ollama can't usefully serve more than one crew at once.
+CREW_MAX_CONCURRENCY = int(os.getenv("CREW_MAX_CONCURRENCY", "1"))
+CREW_QUEUE_LIMIT = int(os.getenv("CREW_QUEUE_LIMIT", "4"))
+CREW_WORKER_SCRIPT = Path(__file__).resolve().parent / "crew_worker.py"
+CREW_JOB_DONE = "\x1e__CREW_JOB_DONE__"  # must match crew_worker.JOB_DONE
+# Echo every streamed crew line to the server console (noisy; off unless debugging)
+CREW_STREAM_ECHO = os.getenv("CREW_STREAM_ECHO", "0") == "1"
+# Output lines arriving within this window are sent as one chunk/event
+CREW_STREAM_COALESCE_MS = float(os.getenv("CREW_STREAM_COALESCE_MS", "25"))
+CREW_STREAM_MAX_CHUNK = 16 * 1024
+# JSON responses at least this big are sent compressed to clients that accept it
+RESPONSE_COMPRESS_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", "1024"))
+RESPONSE_CACHE_ENTRIES = 256
 
 # Allow Tauri frontend
 app.add_middleware(
@@ -60,19 +115,66 @@ def ensure_outputs_dir():
         print(f"⚠️ Failed creating outputs dir {OUTPUTS_DIR}: {e}")
 
 
+_db_local = threading.local()
+_db_conns: list = []
+_db_conns_lock = threading.Lock()
+_db_executor = ThreadPoolExecutor(max_workers=MEMORY_DB_THREADS, thread_name_prefix="memory-db")
+
+
 def get_db() -> sqlite3.Connection:
+    # One connection per thread, opened once; pragmas and the statement cache live as long as it does
+    conn = getattr(_db_local, "conn", None)
+    if conn is not None:
+        return conn
     ensure_outputs_dir()
-    conn = sqlite3.connect(MEMORY_DB_PATH, check_same_thread=False)
+    conn = sqlite3.connect(MEMORY_DB_PATH, check_same_thread=False, cached_statements=256)
+    conn.row_factory = sqlite3.Row
     # Improve concurrency and reliability
     try:
-        conn.row_factory = sqlite3.Row
         conn.execute("PRAGMA journal_mode=WAL;")
         conn.execute("PRAGMA busy_timeout=5000;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        conn.execute("PRAGMA cache_size=-16000;")  # 16 MB page cache
+        conn.execute("PRAGMA mmap_size=268435456;")  # 256 MB of the file read via mmap
+        conn.execute("PRAGMA temp_store=MEMORY;")
     except Exception as e:
         print(f"⚠️ Failed to set DB pragmas: {e}")
+    try:
+        conn.execute("SELECT pow(0.5, 1)")
+    except sqlite3.OperationalError:
+        # SQLite built without math functions; hybrid search ranking needs pow()
+        conn.create_function("pow", 2, math.pow, deterministic=True)
+    _db_local.conn = conn
+    with _db_conns_lock:
+        _db_conns.append(conn)
     return conn
 
 
+def close_db():
+    with _db_conns_lock:
+        conns = list(_db_conns)
+        _db_conns.clear()
+    for conn in conns:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+async def run_db(fn, *args, **kwargs):
+    # Keep blocking SQLite calls off the event loop
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor, functools.partial(fn, *args, **kwargs))
+
+
+def db_fetchall(query: str, params=()) -> list:
+    return get_db().execute(query, params).fetchall()
+
+
+def db_fetchone(query: str, params=()):
+    return get_db().execute(query, params).fetchone()
+
+
 def init_db():
     ensure_outputs_dir()
     conn = get_db()
@@ -93,13 +195,7 @@ def init_db():
     )
 
     # FTS5 virtual table
-    cur.execute(
-        """
-        CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
-            title, content, topic, content='posts', content_rowid='id'
-        )
-        """
-    )
+    cur.execute(fts_create_sql())
 
     # Triggers to keep FTS in sync
     cur.execute(
@@ -114,7 +210,7 @@ def init_db():
     cur.execute(
         """
         CREATE TRIGGER IF NOT EXISTS after_posts_update
-        AFTER UPDATE ON posts BEGIN
+        AFTER UPDATE OF title, content, topic ON posts BEGIN
             INSERT INTO posts_fts(posts_fts, rowid, title, content, topic)
             VALUES ('delete', old.id, old.title, old.content, old.topic);
             INSERT INTO posts_fts(rowid, title, content, topic)
@@ -133,38 +229,326 @@ def init_db():
     )
 
     conn.commit()
-    conn.close()
+    migrate_db(conn)
+    ensure_fts_tokenizer(conn)
     print(f"✅ Memory DB initialized at {MEMORY_DB_PATH}")
 
 
+# prefix='2 3' keeps short prefix queries (type-ahead) on the index instead of scanning terms
+FTS_TOKENIZERS = {
+    "unicode61": "tokenize='unicode61 remove_diacritics 2', prefix='2 3'",
+    "porter": "tokenize='porter unicode61 remove_diacritics 2', prefix='2 3'",
+    "trigram": "tokenize='trigram'",
+}
+
+
+def fts_tokenizer() -> str:
+    name = MEMORY_FTS_TOKENIZER if MEMORY_FTS_TOKENIZER in FTS_TOKENIZERS else "unicode61"
+    if name == "trigram" and sqlite3.sqlite_version_info < (3, 34, 0):
+        print(f"⚠️ SQLite {sqlite3.sqlite_version} has no trigram tokenizer; using unicode61")
+        name = "unicode61"
+    return name
+
+
+def fts_create_sql() -> str:
+    return f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+            title, content, topic, content='posts', content_rowid='id',
+            {FTS_TOKENIZERS[fts_tokenizer()]}
+        )
+        """
+
+
+def ensure_fts_tokenizer(conn: sqlite3.Connection):
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'posts_fts'").fetchone()
+    if row is not None and FTS_TOKENIZERS[fts_tokenizer()] in row["sql"]:
+        return
+    # External-content table: dropping it loses nothing, 'rebuild' re-reads posts
+    with conn:
+        conn.execute("DROP TABLE IF EXISTS posts_fts")
+        conn.execute(fts_create_sql())
+        conn.execute("INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')")
+    print(f"🔧 Rebuilt posts_fts with the {fts_tokenizer()} tokenizer")
+
+
+# --------------------
+# Schema migrations (tracked in PRAGMA user_version)
+# --------------------
+
+def _column_names(conn: sqlite3.Connection, table: str) -> set:
+    return {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def migration_created_ts(conn: sqlite3.Connection):
+    # created_at is text and sorted via datetime(), which no index can serve
+    if "created_ts" not in _column_names(conn, "posts"):
+        conn.execute("ALTER TABLE posts ADD COLUMN created_ts INTEGER")
+    # Only re-index FTS when searchable columns change, so backfills like this one stay cheap
+    conn.execute("DROP TRIGGER IF EXISTS after_posts_update")
+    conn.execute(
+        """
+        CREATE TRIGGER after_posts_update
+        AFTER UPDATE OF title, content, topic ON posts BEGIN
+            INSERT INTO posts_fts(posts_fts, rowid, title, content, topic)
+            VALUES ('delete', old.id, old.title, old.content, old.topic);
+            INSERT INTO posts_fts(rowid, title, content, topic)
+            VALUES (new.id, new.title, new.content, new.topic);
+        END;
+        """
+    )
+    conn.execute(
+        "UPDATE posts SET created_ts = CAST(strftime('%s', created_at) AS INTEGER) WHERE created_ts IS NULL"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_type_created ON posts(type, created_ts DESC, id DESC)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_created ON posts(created_ts DESC, id DESC)")
+
+
+def migration_post_vectors(conn: sqlite3.Connection):
+    # Unit-length float16 embeddings, one per post; rows are dropped when the post goes away or changes
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS post_vectors (
+            post_id INTEGER PRIMARY KEY,
+            model TEXT NOT NULL,
+            vector BLOB NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS after_posts_delete_vector
+        AFTER DELETE ON posts BEGIN
+            DELETE FROM post_vectors WHERE post_id = old.id;
+        END;
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS after_posts_update_vector
+        AFTER UPDATE OF title, content ON posts BEGIN
+            DELETE FROM post_vectors WHERE post_id = old.id;
+        END;
+        """
+    )
+
+
+def migration_topic_counts(conn: sqlite3.Connection):
+    # Per-topic post counts kept current by triggers, so /memory/topics never groups over posts
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS topic_counts (
+            topic TEXT PRIMARY KEY,
+            count INTEGER NOT NULL
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_topic_counts_count ON topic_counts(count DESC, topic)")
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS after_posts_insert_topic
+        AFTER INSERT ON posts BEGIN
+            INSERT INTO topic_counts(topic, count)
+            SELECT new.topic, 1 WHERE new.topic IS NOT NULL AND new.topic != ''
+            ON CONFLICT(topic) DO UPDATE SET count = count + 1;
+        END;
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS after_posts_update_topic
+        AFTER UPDATE OF topic ON posts WHEN old.topic IS NOT new.topic BEGIN
+            UPDATE topic_counts SET count = count - 1 WHERE topic = old.topic;
+            DELETE FROM topic_counts WHERE topic = old.topic AND count <= 0;
+            INSERT INTO topic_counts(topic, count)
+            SELECT new.topic, 1 WHERE new.topic IS NOT NULL AND new.topic != ''
+            ON CONFLICT(topic) DO UPDATE SET count = count + 1;
+        END;
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS after_posts_delete_topic
+        AFTER DELETE ON posts BEGIN
+            UPDATE topic_counts SET count = count - 1 WHERE topic = old.topic;
+            DELETE FROM topic_counts WHERE topic = old.topic AND count <= 0;
+        END;
+        """
+    )
+    conn.execute("DELETE FROM topic_counts")
+    conn.execute(
+        """
+        INSERT INTO topic_counts(topic, count)
+        SELECT topic, COUNT(*) FROM posts
+        WHERE topic IS NOT NULL AND topic != ''
+        GROUP BY topic
+        """
+    )
+
+
+def migration_jobs(conn: sqlite3.Connection):
+    # Crew runs outlive the request that started them; their events are kept for replay
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            topic TEXT,
+            status TEXT NOT NULL,
+            returncode INTEGER,
+            output_dir TEXT,
+            created_ts INTEGER NOT NULL,
+            started_ts INTEGER,
+            finished_ts INTEGER
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_ts DESC)")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS job_events (
+            job_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            type TEXT NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (job_id, seq)
+        ) WITHOUT ROWID
+        """
+    )
+    if "job_id" not in _column_names(conn, "posts"):
+        conn.execute("ALTER TABLE posts ADD COLUMN job_id TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_job ON posts(job_id) WHERE job_id IS NOT NULL")
+
+
+def migration_content_hash(conn: sqlite3.Connection):
+    # Backs the posts' ETags; an edit clears it and readers fall back to hashing the row
+    if "content_hash" not in _column_names(conn, "posts"):
+        conn.execute("ALTER TABLE posts ADD COLUMN content_hash TEXT")
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS after_posts_update_hash
+        AFTER UPDATE OF type, topic, title, content ON posts
+        WHEN new.content_hash IS old.content_hash BEGIN
+            UPDATE posts SET content_hash = NULL WHERE id = new.id;
+        END;
+        """
+    )
+    rows = conn.execute("SELECT id, type, topic, title, content FROM posts WHERE content_hash IS NULL").fetchall()
+    conn.executemany(
+        "UPDATE posts SET content_hash = ? WHERE id = ?",
+        [(post_content_hash(row["type"], row["topic"], row["title"], row["content"]), row["id"]) for row in rows],
+    )
+
+
+def migration_created_ts_trigger(conn: sqlite3.Connection):
+    # Inserts that bypass insert_post (older scripts, manual SQL) would otherwise sort last
+    # and be skipped by keyset cursors
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS after_posts_insert_created_ts
+        AFTER INSERT ON posts WHEN new.created_ts IS NULL BEGIN
+            UPDATE posts
+            SET created_ts = COALESCE(CAST(strftime('%s', new.created_at) AS INTEGER),
+                                      CAST(strftime('%s', 'now') AS INTEGER))
+            WHERE id = new.id;
+        END;
+        """
+    )
+    conn.execute(
+        """
+        UPDATE posts
+        SET created_ts = COALESCE(CAST(strftime('%s', created_at) AS INTEGER), CAST(strftime('%s', 'now') AS INTEGER))
+        WHERE created_ts IS NULL
+        """
+    )
+
+
+def migration_vector_removals(conn: sqlite3.Connection):
+    # Vectors dropped by a post delete or edit, for the in-memory index to catch up on
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS post_vector_removals (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            post_id INTEGER NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS after_post_vectors_delete
+        AFTER DELETE ON post_vectors BEGIN
+            INSERT INTO post_vector_removals(post_id) VALUES (old.post_id);
+        END;
+        """
+    )
+
+
+MIGRATIONS = [
+    migration_created_ts,
+    migration_post_vectors,
+    migration_topic_counts,
+    migration_jobs,
+    migration_content_hash,
+    migration_created_ts_trigger,
+    migration_vector_removals,
+]
+
+
+def migrate_db(conn: sqlite3.Connection):
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        with conn:
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {number}")
+        print(f"🔧 Memory DB migrated to v{number} ({migration.__name__})")
+
+
 @app.on_event("startup")
-def on_startup():
-    init_db()
+async def on_startup():
+    await run_db(init_db)
+    await run_db(mark_interrupted_jobs)
+    # Catch up on posts written while the server was down (or before semantic search existed)
+    schedule_embedding()
+    await crew_pool.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await cancel_running_jobs()
+    await crew_pool.close()
+    _embed_executor.shutdown(wait=False, cancel_futures=True)
+    _db_executor.shutdown(wait=True)
+    close_db()
 
 
 # --------------------
 # Utility: insert posts
 # --------------------
 
-def insert_post(post_type: str, topic: str, title: str, content: str):
+def post_content_hash(post_type: str, topic: Optional[str], title: Optional[str], content: Optional[str]) -> str:
+    data = "\x1f".join(value or "" for value in (post_type, topic, title, content))
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def post_etag(row) -> str:
+    content_hash = row["content_hash"] or post_content_hash(row["type"], row["topic"], row["title"], row["content"])
+    return f'"{row["id"]}-{content_hash}"'
+
+
+def insert_post(post_type: str, topic: str, title: str, content: str, job_id: Optional[str] = None):
+    conn = get_db()
     try:
-        conn = get_db()
-        cur = conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO posts (type, topic, title, content)
-            VALUES (?, ?, ?, ?)
-            """,
-            (post_type, topic, title, content),
-        )
-        conn.commit()
+        with conn:
+            cur = conn.execute(
+                """
+                INSERT INTO posts (type, topic, title, content, created_ts, job_id, content_hash)
+                VALUES (?, ?, ?, ?, CAST(strftime('%s', 'now') AS INTEGER), ?, ?)
+                """,
+                (post_type, topic, title, content, job_id, post_content_hash(post_type, topic, title, content)),
+            )
+        schedule_embedding()
+        return cur.lastrowid
     except Exception as e:
         print(f"⚠️ Failed inserting post into memory: {e}")
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
+        return None
 
 
 def extract_blog_title(content: str, fallback: str) -> str:
@@ -193,75 +577,935 @@ def extract_linkedin_title(content: str, fallback: str) -> str:
     return fallback
 
 
+# --------------------
+# Semantic memory: background post embeddings
+# --------------------
+
+# One thread: embedding is CPU-bound and the model isn't worth loading twice
+_embed_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-embed")
+_embed_lock = threading.Lock()
+_embed_model = None
+_embed_pending = False
+# Loaded by the first search, then kept current by embed_missing_posts. Replaced whole on every
+# change, so searches can read it without the lock.
+_vector_index: dict = {"ids": None, "rows": None, "matrix": None, "ann": None, "ann_rows": 0}
+_vector_lock = threading.Lock()
+
+
+def use_repo_modules():
+    # The embedding cache and ANN index live in the repo root next to build_index.py.
+    # Appended, not prepended, so root scripts like tools.py can't shadow installed packages.
+    if str(REPO_ROOT) not in sys.path:
+        sys.path.append(str(REPO_ROOT))
+
+
+def get_embed_model():
+    global _embed_model
+    with _embed_lock:
+        if _embed_model is None:
+            use_repo_modules()
+            from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+            from embedding_cache import CachedEmbedding, EmbeddingCache
+
+            cache_path = os.getenv("EMBEDDING_CACHE_PATH", str(REPO_ROOT / ".cache" / "embeddings.sqlite"))
+            _embed_model = CachedEmbedding(
+                HuggingFaceEmbedding(model_name=MEMORY_EMBED_MODEL), cache=EmbeddingCache(cache_path)
+            )
+        return _embed_model
+
+
+def post_text(title: Optional[str], content: Optional[str]) -> str:
+    return f"{title or ''}\n\n{content or ''}"[:4000]
+
+
+def to_unit_f16(vectors) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype=np.float32)
+    matrix /= np.maximum(np.linalg.norm(matrix, axis=-1, keepdims=True), 1e-12)
+    return matrix.astype(np.float16)
+
+
+def embed_missing_posts(batch_size: int = 32):
+    global _embed_pending
+    with _embed_lock:
+        _embed_pending = False
+    conn = get_db()
+    while True:
+        rows = conn.execute(
+            """
+            SELECT p.id, p.title, p.content FROM posts p
+            LEFT JOIN post_vectors v ON v.post_id = p.id
+            WHERE v.post_id IS NULL OR v.model != ?
+            LIMIT ?
+            """,
+            (MEMORY_EMBED_MODEL, batch_size),
+        ).fetchall()
+        if not rows:
+            return
+        vectors = to_unit_f16(get_embed_model().get_text_embedding_batch(
+            [post_text(row["title"], row["content"]) for row in rows]
+        ))
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO post_vectors (post_id, model, vector) VALUES (?, ?, ?)",
+                [(row["id"], MEMORY_EMBED_MODEL, vector.tobytes()) for row, vector in zip(rows, vectors)],
+            )
+        add_to_vector_index([row["id"] for row in rows], vectors)
+
+
+def _embed_missing_logged():
+    try:
+        embed_missing_posts()
+    except Exception as e:
+        print(f"⚠️ Background post embedding failed: {e}")
+
+
+def schedule_embedding():
+    # Coalesced: one queued pass picks up every post inserted before it runs
+    global _embed_pending
+    if not MEMORY_SEMANTIC:
+        return
+    with _embed_lock:
+        if _embed_pending:
+            return
+        _embed_pending = True
+    try:
+        _embed_executor.submit(_embed_missing_logged)
+    except RuntimeError:
+        pass  # shutting down
+
+
+def build_ann(matrix: np.ndarray):
+    use_repo_modules()
+    from ann_index import IVFIndex
+    return IVFIndex.build(matrix)
+
+
+def index_from_rows(ids: np.ndarray, matrix: np.ndarray) -> dict:
+    ann = build_ann(matrix) if len(ids) >= MEMORY_ANN_MIN_ROWS else None
+    return {"ids": ids, "rows": {int(post_id): i for i, post_id in enumerate(ids)},
+            "matrix": matrix, "ann": ann, "ann_rows": len(ids) if ann is not None else 0}
+
+
+def compact_vector_index(index: dict) -> dict:
+    # Drops the rows of removed posts (id -1); the IVF lists refer to row numbers, so it is rebuilt too
+    keep = index["ids"] >= 0
+    return index_from_rows(index["ids"][keep], index["matrix"][keep])
+
+
+def apply_vector_removals(conn: sqlite3.Connection, index: dict) -> dict:
+    # Caller holds _vector_lock. Removed posts keep their matrix row (id set to -1) until the
+    # next compaction, which happens right away while there is no IVF index to rebuild.
+    removals = conn.execute("SELECT seq, post_id FROM post_vector_removals ORDER BY seq").fetchall()
+    if not removals:
+        return index
+    with conn:
+        conn.execute("DELETE FROM post_vector_removals WHERE seq <= ?", (removals[-1]["seq"],))
+    # Edited posts lost their vector along with the old text
+    schedule_embedding()
+    gone = {row["post_id"] for row in removals} & index["rows"].keys()
+    if not gone:
+        return index
+    ids, rows = index["ids"].copy(), dict(index["rows"])
+    for post_id in gone:
+        ids[rows.pop(post_id)] = -1
+    index = {**index, "ids": ids, "rows": rows}
+    return compact_vector_index(index) if index["ann"] is None else index
+
+
+def load_vector_index() -> dict:
+    # Loads every vector the first time, then only catches up on removals; runs on a DB thread (run_db)
+    global _vector_index
+    conn = get_db()
+    with _vector_lock:
+        if _vector_index["matrix"] is not None:
+            _vector_index = apply_vector_removals(conn, _vector_index)
+            return _vector_index
+        # Removals logged before this point are already reflected in the rows read below
+        last = conn.execute("SELECT MAX(seq) FROM post_vector_removals").fetchone()[0]
+        if last is not None:
+            with conn:
+                conn.execute("DELETE FROM post_vector_removals WHERE seq <= ?", (last,))
+        rows = conn.execute(
+            "SELECT post_id, vector FROM post_vectors WHERE model = ? ORDER BY post_id", (MEMORY_EMBED_MODEL,)
+        ).fetchall()
+        ids = np.array([row["post_id"] for row in rows], dtype=np.int64)
+        matrix = (
+            np.frombuffer(b"".join(row["vector"] for row in rows), dtype=np.float16).reshape(len(rows), -1).astype(np.float32)
+            if rows else np.zeros((0, 0), dtype=np.float32)
+        )
+        _vector_index = index_from_rows(ids, matrix)
+        return _vector_index
+
+
+def add_to_vector_index(post_ids: list, vectors: np.ndarray):
+    # Called after new vectors are committed. Before the first search there is nothing to update:
+    # the full load will read them from the table.
+    global _vector_index
+    with _vector_lock:
+        index = _vector_index
+        if index["matrix"] is None:
+            return
+        # Removals first, so a post edited and re-embedded since ends up with its new vector
+        index = apply_vector_removals(get_db(), index)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        ids, rows, matrix = index["ids"], dict(index["rows"]), index["matrix"]
+        replaced = [i for i, post_id in enumerate(post_ids) if post_id in rows]
+        added = [i for i, post_id in enumerate(post_ids) if post_id not in rows]
+        if replaced:
+            # Re-embedded posts (e.g. a new model) keep their row; copied so readers never see a half-written row
+            matrix = matrix.copy()
+            matrix[[rows[post_ids[i]] for i in replaced]] = vectors[replaced]
+        if added:
+            first = len(ids)
+            matrix = vectors[added] if not len(matrix) else np.concatenate([matrix, vectors[added]])
+            ids = np.concatenate([ids, np.array([post_ids[i] for i in added], dtype=np.int64)])
+            rows.update({post_ids[i]: first + n for n, i in enumerate(added)})
+        index = {**index, "ids": ids, "rows": rows, "matrix": matrix}
+
+        ann, ann_rows = index["ann"], index["ann_rows"]
+        if len(rows) >= MEMORY_ANN_MIN_ROWS and (ann is None or len(rows) >= ann_rows * MEMORY_ANN_REBUILD_GROWTH):
+            index = compact_vector_index(index)
+        elif ann is not None:
+            changed = [rows[post_ids[i]] for i in replaced + added]
+            index["ann"] = ann.add(matrix[changed], changed)
+        _vector_index = index
+
+
+def vector_ranking(index: dict, query_vector: np.ndarray, k: int, exclude: Optional[int] = None) -> list:
+    matrix = index["matrix"]
+    if not len(matrix):
+        return []
+    rows = index["ann"].candidates(query_vector) if index["ann"] is not None else np.arange(len(matrix))
+    ids = index["ids"][rows]
+    scores = matrix[rows] @ query_vector
+    scores[ids < 0] = -np.inf  # removed posts awaiting compaction
+    top = np.argsort(-scores)[:k + 1]
+    ranked = [(int(ids[i]), float(scores[i])) for i in top if ids[i] >= 0]
+    return [(post_id, score) for post_id, score in ranked if post_id != exclude][:k]
+
+
+def keyword_ranking(match: Optional[str], k: int, exclude: Optional[int] = None) -> list:
+    if not match:
+        return []
+    rows = get_db().execute(
+        """
+        SELECT rowid AS id FROM posts_fts
+        WHERE posts_fts MATCH ? AND rank MATCH ?
+        ORDER BY rank LIMIT ?
+        """,
+        (match, f"bm25({BM25_ARGS})", k + 1),
+    ).fetchall()
+    return [row["id"] for row in rows if row["id"] != exclude][:k]
+
+
+async def semantic_search(q: Optional[str], similar_to: Optional[int], limit: int, rrf_k: int = 60) -> dict:
+    # SQLite work goes through run_db; embedding and scoring run on the default executor
+    loop = asyncio.get_running_loop()
+    candidates = max(limit * 4, 50)
+    query_vector = None
+    if similar_to is not None:
+        post = await run_db(
+            db_fetchone,
+            """
+            SELECT p.title, p.content, v.vector FROM posts p
+            LEFT JOIN post_vectors v ON v.post_id = p.id AND v.model = ?
+            WHERE p.id = ?
+            """,
+            (MEMORY_EMBED_MODEL, similar_to),
+        )
+        if post is None:
+            return {"error": "Post not found"}
+        if post["vector"] is not None:
+            query_vector = np.frombuffer(post["vector"], dtype=np.float16).astype(np.float32)
+        else:
+            text = post_text(post["title"], post["content"])
+            query_vector = to_unit_f16(await loop.run_in_executor(None, lambda: get_embed_model().get_text_embedding(text)))
+        # The post's own title stands in for the keyword side; any shared word is a hit
+        match = build_match_query(q, prefix=False) if q else build_match_query(post["title"] or "", prefix=False, any_term=True)
+    else:
+        query_vector = to_unit_f16(await loop.run_in_executor(None, lambda: get_embed_model().get_query_embedding(q)))
+        match = build_match_query(q, prefix=False)
+
+    index = await run_db(load_vector_index)
+    vector_hits = await loop.run_in_executor(
+        None, vector_ranking, index, np.asarray(query_vector, dtype=np.float32), candidates, similar_to
+    )
+    keyword_hits = await run_db(keyword_ranking, match, candidates, exclude=similar_to)
+
+    # Reciprocal rank fusion: robust to bm25 and cosine living on different scales
+    fused: dict = {}
+    for rank, (post_id, similarity) in enumerate(vector_hits, 1):
+        fused[post_id] = {"score": 1.0 / (rrf_k + rank), "vector_rank": rank, "similarity": round(similarity, 4)}
+    for rank, post_id in enumerate(keyword_hits, 1):
+        entry = fused.setdefault(post_id, {"score": 0.0, "vector_rank": None, "similarity": None})
+        entry["score"] += 1.0 / (rrf_k + rank)
+        entry["keyword_rank"] = rank
+    # Over-fetched: a hit whose post was deleted a moment ago must not leave the page short
+    top = sorted(fused.items(), key=lambda item: item[1]["score"], reverse=True)[:candidates]
+    if not top:
+        return {"posts": []}
+
+    ids = [post_id for post_id, _ in top]
+    rows = await run_db(
+        db_fetchall, f"SELECT id, created_at, type, topic, title FROM posts WHERE id IN ({','.join('?' * len(ids))})", ids
+    )
+    by_id = {row["id"]: row for row in rows}
+    return {
+        "posts": [
+            {
+                "id": post_id,
+                "created_at": by_id[post_id]["created_at"],
+                "type": by_id[post_id]["type"],
+                "topic": by_id[post_id]["topic"],
+                "title": by_id[post_id]["title"],
+                "score": round(info["score"], 6),
+                "similarity": info["similarity"],
+                "vector_rank": info["vector_rank"],
+                "keyword_rank": info.get("keyword_rank"),
+            }
+            for post_id, info in top
+            if post_id in by_id
+        ][:limit]
+    }
+
+
 # --------------------
 # Streaming crew execution
 # --------------------
 
-@app.post("/run-crew-stream")
-async def run_crew_stream(request: TopicRequest):
-    async def stream_output():
+class CrewPoolFull(Exception):
+    pass
+
+
+# Crew output lines worth surfacing as their own events; everything else streams as "token"
+AGENT_LINE_RE = re.compile(r"^\W*Agent:\s*(?P<name>.+?)\s*$")
+STAGE_PREFIXES = ("🔍", "🧠", "✍", "🚀", "📝", "✅", "📣", "⏳", "🐝", "# Task:", "## Task:")
+
+
+def classify_line(line: str) -> dict:
+    stripped = line.strip()
+    match = AGENT_LINE_RE.match(stripped)
+    if match:
+        return {"type": "agent", "name": match.group("name"), "text": line}
+    if stripped.startswith(STAGE_PREFIXES):
+        return {"type": "stage", "text": line}
+    return {"type": "token", "text": line}
+
+
+class CrewWorker:
+    def __init__(self, proc: asyncio.subprocess.Process):
+        self.proc = proc
+        # Events for the job in progress; stderr lines land here as they arrive
+        self.events: Optional[asyncio.Queue] = None
+        # Set whenever the worker has flushed stderr for start-up or the last job
+        self.stderr_done = asyncio.Event()
+        # Always drained, so a chatty crew can't fill the pipe and stall
+        self._stderr_task = asyncio.create_task(self._drain_stderr())
+
+    async def _drain_stderr(self):
+        while True:
+            raw = await self.proc.stderr.readline()
+            if not raw:
+                self.stderr_done.set()
+                return
+            line = raw.decode("utf-8", errors="replace")
+            if line.startswith(CREW_JOB_DONE):
+                self.stderr_done.set()
+            elif self.events is not None:
+                self.events.put_nowait({"type": "error", "text": line})
+            else:
+                print(f"🐝 crew worker: {line.rstrip()}")
+
+    async def read_stdout(self):
+        # Feeds the job's event queue until the worker's end-of-job line (or EOF); ends with "done"
+        events = self.events
+        while True:
+            try:
+                raw = await self.proc.stdout.readline()
+            except (ValueError, asyncio.LimitOverrunError) as e:
+                # A line past the reader limit leaves the stream mid-line; the worker can't be reused
+                events.put_nowait({"type": "error", "text": f"crew worker output unreadable: {e}\n"})
+                events.put_nowait({"type": "done", "returncode": None, "worker_ok": False})
+                self.stderr_done.set()
+                return
+            if not raw:
+                returncode = await self.proc.wait()
+                events.put_nowait({"type": "error", "text": f"crew worker exited with code {returncode}\n"})
+                events.put_nowait({"type": "done", "returncode": returncode, "worker_ok": False})
+                self.stderr_done.set()
+                return
+            line = raw.decode("utf-8", errors="replace")
+            marker = line.find(CREW_JOB_DONE)
+            if marker >= 0:
+                if marker:
+                    events.put_nowait(classify_line(line[:marker] + "\n"))
+                result = json.loads(line[marker + len(CREW_JOB_DONE):])
+                events.put_nowait({"type": "done", "returncode": result["returncode"], "worker_ok": True})
+                return
+            events.put_nowait(classify_line(line))
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.returncode is None
+
+    def kill(self):
+        if self.alive:
+            self.proc.kill()
+
+
+class CrewWorkerPool:
+    """Pre-started crew_worker.py processes; runs beyond max_concurrency queue, beyond queue_limit are refused."""
+
+    def __init__(self, max_concurrency: int = CREW_MAX_CONCURRENCY, queue_limit: int = CREW_QUEUE_LIMIT):
+        self.max_concurrency = max_concurrency
+        self.queue_limit = queue_limit
+        self.active = 0  # running + waiting
+        # One entry per slot: a worker, or None when its (re)spawn failed and the next run should retry
+        self._idle: Optional[asyncio.Queue] = None
+        self._tasks: set = set()  # pending replacements
+
+    async def _spawn(self) -> CrewWorker:
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable,
+            str(CREW_WORKER_SCRIPT),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=str(REPO_ROOT),  # run from repo root
+            env={**os.environ, "PYTHONUNBUFFERED": "1"},
+            limit=1 << 20,  # LLM output can be one very long line
+        )
+        return CrewWorker(proc)
+
+    async def _replace(self, worker: CrewWorker):
+        worker.kill()
         try:
-            # ✅ Print for debugging
-            print(f"🚀 Running: python simple_crew.py '{request.topic}'")
-
-            # ✅ Run the crew script from the repo root
-            process = await asyncio.create_subprocess_exec(
-                "python",
-                "simple_crew.py",
-                request.topic,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=str(REPO_ROOT),  # run from repo root
-            )
+            self._idle.put_nowait(await self._spawn())
+        except Exception as e:
+            print(f"⚠️ Failed to restart crew worker, will retry on the next run: {e}")
+            self._idle.put_nowait(None)
 
-            # ✅ Stream stdout line by line
-            while True:
-                line = await process.stdout.readline()
-                if not line:
-                    break
-                decoded_line = line.decode("utf-8", errors="replace")
-                print(f"📤 Streaming: {decoded_line.strip()}")  # Debug output
-                yield decoded_line
-
-            # ✅ Check for errors
-            stderr_output = await process.stderr.read()
-            if stderr_output:
-                error_msg = stderr_output.decode("utf-8", errors="replace")
-                print(f"❌ Error output: {error_msg}")
-                yield f"❌ Error: {error_msg}\n"
-
-            # ✅ Wait for process to finish
-            return_code = await process.wait()
-            print(f"✅ Process finished with return code: {return_code}")
-
-            # ✅ After process completion, persist generated outputs to memory
+    async def start(self):
+        if self._idle is not None:
+            return
+        self._idle = asyncio.Queue()
+        for _ in range(self.max_concurrency):
             try:
-                if BLOG_PATH.exists():
-                    blog_content = BLOG_PATH.read_text(encoding="utf-8", errors="ignore")
-                    blog_title = extract_blog_title(blog_content, fallback=f"Mindful Tech: {request.topic}")
-                    insert_post("blog", request.topic, blog_title, blog_content)
-                    print("📝 Blog inserted into memory DB")
-                else:
-                    print(f"ℹ️ Blog file not found at {BLOG_PATH}")
+                self._idle.put_nowait(await self._spawn())
+            except Exception as e:
+                print(f"⚠️ Failed to start crew worker, will retry on the next run: {e}")
+                self._idle.put_nowait(None)
+        print(f"✅ {self.max_concurrency} crew worker(s) warming up")
+
+    async def close(self):
+        if self._idle is None:
+            return
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        while not self._idle.empty():
+            worker = self._idle.get_nowait()
+            if worker is not None:
+                worker.kill()
+
+    def reserve(self):
+        # Called before the response starts, so a full pool can still answer 429
+        if self.active >= self.max_concurrency + self.queue_limit:
+            raise CrewPoolFull(f"{self.active} crew runs in progress or queued; try again later")
+        self.active += 1
+
+    def release(self):
+        # For a reserve() whose run never started
+        self.active -= 1
+
+    async def run(self, topic: str, cwd: Optional[Path] = None):
+        """Yields "start" once a worker is free, then the run's events (see classify_line), ending with "done".
 
-                if LINKEDIN_PATH.exists():
-                    li_content = LINKEDIN_PATH.read_text(encoding="utf-8", errors="ignore")
-                    li_title = extract_linkedin_title(li_content, fallback=f"LinkedIn: {request.topic}")
-                    insert_post("linkedin", request.topic, li_title, li_content)
-                    print("📝 LinkedIn post inserted into memory DB")
+        Needs a prior reserve(). Cancelling the generator kills the run.
+        """
+        worker = None
+        slot_taken = False
+        finished = False
+        reader = None
+        try:
+            await self.start()
+            if self._idle.empty():
+                yield {"type": "stage", "text": f"⏳ Waiting for a free crew worker ({self.active - self.max_concurrency} run(s) queued)\n"}
+            worker = await self._idle.get()
+            slot_taken = True
+            if worker is None or not worker.alive:
+                worker = None
+                worker = await self._spawn()
+
+            await worker.stderr_done.wait()
+            worker.stderr_done.clear()
+            yield {"type": "start"}
+            events: asyncio.Queue = asyncio.Queue()
+            worker.events = events
+            job = {"topic": topic, "cwd": str(cwd) if cwd else None}
+            worker.proc.stdin.write((json.dumps(job) + "\n").encode("utf-8"))
+            await worker.proc.stdin.drain()
+            # stdout and stderr are read concurrently into one queue, so neither pipe can back up.
+            # Lines interleave by arrival: stderr is not ordered relative to stdout
+            reader = asyncio.create_task(worker.read_stdout())
+
+            done = None
+            pending = None
+            while done is None:
+                event = pending or await events.get()
+                pending = None
+                if event["type"] == "done":
+                    # stderr may still be catching up with the last stdout line
+                    try:
+                        await asyncio.wait_for(worker.stderr_done.wait(), timeout=2)
+                    except asyncio.TimeoutError:
+                        pass
+                    done = event
+                    if events.empty():
+                        break
+                    event = events.get_nowait()
+                if event["type"] in ("token", "error"):
+                    # Coalesce a burst of small lines into one chunk
+                    deadline = asyncio.get_running_loop().time() + CREW_STREAM_COALESCE_MS / 1000
+                    while len(event["text"]) < CREW_STREAM_MAX_CHUNK:
+                        try:
+                            timeout = max(0.0, deadline - asyncio.get_running_loop().time())
+                            nxt = events.get_nowait() if done else await asyncio.wait_for(events.get(), timeout)
+                        except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                            break
+                        if nxt["type"] != event["type"]:
+                            pending = nxt
+                            break
+                        event = {**event, "text": event["text"] + nxt["text"]}
+                yield event
+                if done is not None:
+                    while pending is not None or not events.empty():
+                        event, pending = pending or events.get_nowait(), None
+                        if event["type"] != "done":
+                            yield event
+                    break
+
+            worker.events = None
+            finished = done["worker_ok"]
+            print(f"✅ Process finished with return code: {done['returncode']}")
+            yield {"type": "done", "returncode": done["returncode"]}
+        finally:
+            self.active -= 1
+            if reader is not None and not reader.done():
+                reader.cancel()
+            if worker is not None:
+                if finished and worker.alive:
+                    self._idle.put_nowait(worker)
                 else:
-                    print(f"ℹ️ LinkedIn file not found at {LINKEDIN_PATH}")
-            except Exception as e:
-                print(f"⚠️ Failed to save outputs to memory DB: {e}")
+                    # Client went away mid-run (or the worker died): the run can't be interrupted
+                    # cleanly inside the worker, so replace the whole process
+                    worker.events = None
+                    task = asyncio.create_task(self._replace(worker))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+            elif slot_taken:
+                # Spawning failed: give the slot back so the pool never shrinks
+                self._idle.put_nowait(None)
+
+
+crew_pool = CrewWorkerPool()
+
+
+def format_plain(event: dict) -> str:
+    if event["type"] == "error":
+        return f"❌ Error: {event['text']}"
+    return event.get("text", "")
+
+
+def format_sse(event: dict, seq: Optional[int] = None) -> str:
+    event_id = f"id: {seq}\n" if seq is not None else ""
+    return f"{event_id}event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+def wants_sse(raw: Request, format: Optional[str]) -> bool:
+    # text/plain stays the default (the UI reads it as text); SSE clients get typed events
+    return format == "sse" or "text/event-stream" in raw.headers.get("accept", "")
+
+
+def event_stream_response(events, sse: bool, headers: Optional[dict] = None) -> StreamingResponse:
+    async def body():
+        async for seq, event in events:
+            chunk = format_sse(event, seq) if sse else format_plain(event)
+            if chunk:
+                yield chunk
+
+    if sse:
+        headers = {**(headers or {}), "Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        return StreamingResponse(body(), media_type="text/event-stream", headers=headers)
+    return StreamingResponse(body(), media_type="text/plain", headers=headers)
+
+
+# --------------------
+# Crew jobs: runs live in background tasks, their events in memory.db
+# --------------------
+
+class JobRun:
+    def __init__(self, job_id: str, topic: str, output_dir: Path):
+        self.id = job_id
+        self.topic = topic
+        self.output_dir = output_dir
+        self.events: list = []  # index == seq
+        self.changed = asyncio.Condition()
+        self.started = False  # run_job got to run; from then on crew_pool.run owns the reservation
+        self.finished = False
+        self.task: Optional[asyncio.Task] = None
+        self.finalizer: Optional[asyncio.Task] = None
+
+
+# Runs in progress, by job id; finished runs are only in the DB
+_job_runs: dict = {}
+
 
+def now_ts() -> int:
+    return int(time.time())
+
+
+def create_job(job_id: str, topic: str, output_dir: Path):
+    conn = get_db()
+    with conn:
+        conn.execute(
+            "INSERT INTO jobs (id, topic, status, output_dir, created_ts) VALUES (?, ?, 'queued', ?, ?)",
+            (job_id, topic, str(output_dir), now_ts()),
+        )
+
+
+def update_job(job_id: str, **fields):
+    conn = get_db()
+    with conn:
+        conn.execute(
+            f"UPDATE jobs SET {', '.join(f'{name} = ?' for name in fields)} WHERE id = ?",
+            (*fields.values(), job_id),
+        )
+
+
+def insert_job_event(job_id: str, seq: int, event: dict):
+    conn = get_db()
+    with conn:
+        conn.execute(
+            "INSERT INTO job_events (job_id, seq, type, data) VALUES (?, ?, ?, ?)",
+            (job_id, seq, event["type"], json.dumps(event, ensure_ascii=False)),
+        )
+
+
+def mark_interrupted_jobs():
+    # Whatever was running when the server last stopped is gone with its worker
+    conn = get_db()
+    with conn:
+        cur = conn.execute(
+            "UPDATE jobs SET status = 'interrupted', finished_ts = ? WHERE status IN ('queued', 'running')",
+            (now_ts(),),
+        )
+    if cur.rowcount:
+        print(f"ℹ️ Marked {cur.rowcount} unfinished crew job(s) as interrupted")
+
+
+def save_job_outputs(job_id: str, topic: str, output_dir: Path) -> dict:
+    # The crew writes outputs/blog.md etc. relative to its working directory, i.e. the job's directory
+    post_ids = {}
+    outputs = [
+        ("blog", BLOG_PATH, extract_blog_title, f"Mindful Tech: {topic}"),
+        ("linkedin", LINKEDIN_PATH, extract_linkedin_title, f"LinkedIn: {topic}"),
+    ]
+    for post_type, legacy_path, extract_title, fallback in outputs:
+        path = output_dir / legacy_path.relative_to(REPO_ROOT)
+        if not path.exists():
+            print(f"ℹ️ {post_type} output not found at {path}")
+            continue
+        content = path.read_text(encoding="utf-8", errors="ignore")
+        post_ids[post_type] = insert_post(post_type, topic, extract_title(content, fallback=fallback), content, job_id)
+        print(f"📝 {post_type} post inserted into memory DB")
+        # /latest-blog and /latest-linkedin still read the shared files; replace them in one step
+        try:
+            tmp = legacy_path.with_name(f".{legacy_path.name}.{job_id}.tmp")
+            shutil.copyfile(path, tmp)
+            os.replace(tmp, legacy_path)
         except Exception as e:
-            # ✅ Catch and yield friendly error
-            error_msg = f"❌ Error: {str(e)}\n"
-            print(error_msg)
-            yield error_msg
+            print(f"⚠️ Failed to update {legacy_path}: {e}")
+    return post_ids
 
-    # ✅ Return streaming response
-    return StreamingResponse(stream_output(), media_type="text/plain")
+
+async def record_event(run: JobRun, event: dict):
+    # seq is claimed before awaiting, so a cancel mid-insert can't hand the same seq out twice
+    seq = len(run.events)
+    run.events.append(event)
+    try:
+        await run_db(insert_job_event, run.id, seq, event)
+    except Exception as e:
+        print(f"⚠️ Failed to store event for job {run.id}: {e}")
+    async with run.changed:
+        run.changed.notify_all()
+
+
+async def run_job(run: JobRun):
+    run.started = True
+    status, returncode, post_ids = "failed", None, {}
+    try:
+        async for event in crew_pool.run(run.topic, cwd=run.output_dir):
+            if event["type"] == "start":
+                await run_db(update_job, run.id, status="running", started_ts=now_ts())
+            elif event["type"] == "done":
+                returncode = event["returncode"]
+                continue
+            if CREW_STREAM_ECHO and "text" in event:
+                print(f"📤 Streaming {event['type']}: {event['text'].rstrip()}")
+            await record_event(run, event)
+
+        # ✅ After process completion, persist generated outputs to memory
+        try:
+            post_ids = await run_db(save_job_outputs, run.id, run.topic, run.output_dir)
+        except Exception as e:
+            print(f"⚠️ Failed to save outputs to memory DB: {e}")
+        status = "succeeded" if returncode == 0 else "failed"
+    except asyncio.CancelledError:
+        status = "cancelled"
+        await record_event(run, {"type": "stage", "text": "🛑 Run cancelled\n"})
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        await record_event(run, {"type": "error", "text": f"{str(e)}\n"})
+
+    # Shielded: a second cancel must not leave the job half-finished
+    run.finalizer = asyncio.ensure_future(finish_job(run, status, returncode, post_ids))
+    await asyncio.shield(run.finalizer)
+
+
+async def finish_job(run: JobRun, status: str, returncode: Optional[int] = None, post_ids: Optional[dict] = None):
+    await record_event(run, {"type": "done", "job_id": run.id, "status": status,
+                             "returncode": returncode, "post_ids": post_ids or {}})
+    try:
+        await run_db(update_job, run.id, status=status, returncode=returncode, finished_ts=now_ts())
+    except Exception as e:
+        print(f"⚠️ Failed to update job {run.id}: {e}")
+    async with run.changed:
+        run.finished = True
+        run.changed.notify_all()
+    _job_runs.pop(run.id, None)
+    print(f"🏁 Crew job {run.id} {status}")
+
+
+async def start_job(topic: str) -> JobRun:
+    """Starts a crew run in the background. Needs a prior crew_pool.reserve()."""
+    job_id = uuid.uuid4().hex
+    output_dir = JOBS_DIR / job_id
+    try:
+        (output_dir / BLOG_PATH.parent.relative_to(REPO_ROOT)).mkdir(parents=True, exist_ok=True)
+        await run_db(create_job, job_id, topic, output_dir)
+    except Exception:
+        crew_pool.release()
+        raise
+    run = JobRun(job_id, topic, output_dir)
+    _job_runs[job_id] = run
+    run.task = asyncio.create_task(run_job(run))
+    run.task.add_done_callback(functools.partial(on_job_task_done, run))
+    return run
+
+
+def on_job_task_done(run: JobRun, task: asyncio.Task):
+    # A task cancelled before its first step never runs any of run_job, and one cancelled while
+    # handling a cancel never gets to finish_job; either way the run still has to be closed out
+    if run.finalizer is not None:
+        return
+    if not run.started:
+        crew_pool.release()
+    run.finalizer = asyncio.ensure_future(finish_job(run, "cancelled" if task.cancelled() else "failed"))
+
+
+async def follow_job(job_id: str, offset: int = 0):
+    """Yields (seq, event) from `offset` on: stored events, then live ones until the run is done."""
+    run = _job_runs.get(job_id)
+    if run is None:
+        rows = await run_db(
+            db_fetchall, "SELECT seq, data FROM job_events WHERE job_id = ? AND seq >= ? ORDER BY seq", (job_id, offset)
+        )
+        for row in rows:
+            yield row["seq"], json.loads(row["data"])
+        return
+    seq = offset
+    while True:
+        async with run.changed:
+            await run.changed.wait_for(lambda: len(run.events) > seq or run.finished)
+        while seq < len(run.events):
+            yield seq, run.events[seq]
+            seq += 1
+        if run.finished and seq >= len(run.events):
+            return
+
+
+async def cancel_running_jobs():
+    tasks = [run.task for run in _job_runs.values() if run.task is not None]
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        await asyncio.wait(tasks, timeout=5)
+    finalizers = [run.finalizer for run in list(_job_runs.values()) if run.finalizer is not None]
+    if finalizers:
+        await asyncio.wait(finalizers, timeout=5)
+
+
+def get_job(job_id: str) -> Optional[dict]:
+    row = db_fetchone(
+        """
+        SELECT id, topic, status, returncode, output_dir, created_ts, started_ts, finished_ts,
+               (SELECT COUNT(*) FROM job_events WHERE job_id = jobs.id) AS event_count
+        FROM jobs WHERE id = ?
+        """,
+        (job_id,),
+    )
+    if row is None:
+        return None
+    posts = db_fetchall("SELECT id, type, title FROM posts WHERE job_id = ? ORDER BY id", (job_id,))
+    return {**dict(row), "posts": [dict(post) for post in posts]}
+
+
+@app.post("/run-crew-stream")
+async def run_crew_stream(request: TopicRequest, raw: Request, format: Optional[str] = None):
+    try:
+        crew_pool.reserve()
+    except CrewPoolFull as e:
+        return JSONResponse(status_code=429, content={"error": str(e)}, headers={"Retry-After": "30"})
+
+    try:
+        # ✅ Print for debugging
+        print(f"🚀 Running: simple_crew.py '{request.topic}' on a warm crew worker")
+        run = await start_job(request.topic)
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"error": str(e)})
+
+    # Disconnecting only stops this stream; the run goes on and can be re-joined via /jobs/{id}/events
+    return event_stream_response(follow_job(run.id), wants_sse(raw, format), headers={"X-Job-Id": run.id})
+
+
+@app.get("/jobs")
+async def list_jobs(limit: int = 20):
+    try:
+        rows = await run_db(
+            db_fetchall,
+            """
+            SELECT id, topic, status, returncode, created_ts, started_ts, finished_ts
+            FROM jobs ORDER BY created_ts DESC LIMIT ?
+            """,
+            (max(1, min(limit, 200)),),
+        )
+        return {"jobs": [dict(row) for row in rows]}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(raw: Request, job_id: str):
+    try:
+        job = await run_db(get_job, job_id)
+        if job is None:
+            return {"error": "Job not found"}
+        return api_response(raw, job)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, raw: Request, offset: int = 0, format: Optional[str] = None):
+    try:
+        job = await run_db(db_fetchone, "SELECT id FROM jobs WHERE id = ?", (job_id,))
+        if job is None:
+            return {"error": "Job not found"}
+    except Exception as e:
+        return {"error": str(e)}
+    # EventSource reconnects send the last id they saw
+    last_event_id = raw.headers.get("last-event-id")
+    if last_event_id and last_event_id.isdigit():
+        offset = max(offset, int(last_event_id) + 1)
+    return event_stream_response(follow_job(job_id, max(0, offset)), wants_sse(raw, format), headers={"X-Job-Id": job_id})
+
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    run = _job_runs.get(job_id)
+    if run is None or run.task is None:
+        return {"error": "Job is not running"}
+    run.task.cancel()
+    return {"status": "cancelling", "id": job_id}
+
+
+# --------------------
+# JSON responses: fast encoding, compression and ETags. A helper rather than middleware,
+# so the streaming endpoints are never buffered.
+# --------------------
+
+def content_etag(content) -> str:
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    return '"' + hashlib.blake2b(data, digest_size=8).hexdigest() + '"'
+
+
+def etag_matches(raw: Request, etag: str) -> bool:
+    header = raw.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def encode_json(payload) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def pick_encoding(raw: Request) -> Optional[str]:
+    accepted = set()
+    for part in raw.headers.get("accept-encoding", "").split(","):
+        name, _, params = part.strip().lower().partition(";")
+        if name and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            accepted.add(name)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+# (etag, accepted encoding) -> (body, content encoding); repeat fetches skip encoding and compressing
+_encoded_bodies: OrderedDict = OrderedDict()
+
+
+def encoded_body(payload, etag: str, encoding: Optional[str], body: Optional[bytes] = None) -> tuple:
+    key = (etag, encoding)
+    cached = _encoded_bodies.get(key)
+    if cached is not None:
+        _encoded_bodies.move_to_end(key)
+        return cached
+    body = body if body is not None else encode_json(payload)
+    if encoding is None or len(body) < RESPONSE_COMPRESS_MIN_BYTES:
+        cached = (body, None)
+    elif encoding == "br":
+        cached = (brotli.compress(body, quality=5), "br")
+    else:
+        cached = (gzip.compress(body, compresslevel=6), "gzip")
+    _encoded_bodies[key] = cached
+    if len(_encoded_bodies) > RESPONSE_CACHE_ENTRIES:
+        _encoded_bodies.popitem(last=False)
+    return cached
+
+
+def api_response(raw: Request, payload, etag: Optional[str] = None) -> Response:
+    """JSON response with an ETag (derived from the body unless given), 304s and compression.
+
+    Pass an etag when the caller knows one cheaply (a post's id + content hash); then a
+    revalidation or a cached body costs no serialization at all.
+    """
+    body = None
+    if etag is None:
+        body = encode_json(payload)
+        etag = content_etag(body)
+    # no-cache: clients keep the body but revalidate every time, which is what a polling UI wants
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if etag_matches(raw, etag):
+        return Response(status_code=304, headers=headers)
+    body, encoding = encoded_body(payload, etag, pick_encoding(raw), body)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 # --------------------
@@ -273,32 +1517,69 @@ async def health():
     return {"status": "healthy"}
 
 
+class OutputFileCache:
+    """Output files kept in memory; a file is re-read only when its mtime or size changes."""
+
+    def __init__(self):
+        self._files: dict = {}  # path -> ((mtime_ns, size), content, etag)
+        self._listings: dict = {}  # (directory, pattern) -> (directory mtime_ns, matching files)
+
+    def read(self, path: Path) -> Optional[tuple[str, str]]:
+        """(content, etag) or None if the file doesn't exist."""
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            self._files.pop(path, None)
+            return None
+        key = (st.st_mtime_ns, st.st_size)
+        cached = self._files.get(path)
+        if cached is None or cached[0] != key:
+            content = path.read_text(encoding="utf-8", errors="ignore")
+            cached = self._files[path] = (key, content, content_etag(content))
+        return cached[1], cached[2]
+
+    def latest(self, directory: Path, pattern: str) -> Optional[Path]:
+        # Creating or removing a file bumps the directory's mtime, so only then is it listed again.
+        # Rewriting a file in place doesn't, so the matches are re-stat'ed on every call
+        mtime = directory.stat().st_mtime_ns
+        cached = self._listings.get((directory, pattern))
+        if cached is None or cached[0] != mtime:
+            cached = self._listings[(directory, pattern)] = (mtime, list(directory.glob(pattern)))
+        newest, newest_ctime = None, None
+        for path in cached[1]:
+            try:
+                ctime = path.stat().st_ctime
+            except FileNotFoundError:
+                continue
+            if newest_ctime is None or ctime > newest_ctime:
+                newest, newest_ctime = path, ctime
+        return newest
+
+output_files = OutputFileCache()
+
+
+def latest_file_response(raw: Request, path: Optional[Path], missing: str) -> Response:
+    found = output_files.read(path) if path is not None else None
+    content, etag = found if found else (missing, content_etag(missing))
+    return api_response(raw, {"content": content}, etag)
+
+
 @app.get("/latest-blog")
-async def get_latest_blog():
+async def get_latest_blog(raw: Request):
     try:
-        if BLOG_PATH.exists():
-            content = BLOG_PATH.read_text(encoding="utf-8", errors="ignore")
-            return {"content": content}
-        # Fallback to any older files if needed
-        import glob
-        files = list(REPO_ROOT.glob("mindful_tech_simple_output_*.md"))
-        if not files:
-            return {"content": "# No blog found yet\n\nRun the crew to generate one!"}
-        latest_file = max(files, key=lambda p: p.stat().st_ctime)
-        content = latest_file.read_text(encoding="utf-8", errors="ignore")
-        return {"content": content}
+        path = BLOG_PATH if BLOG_PATH.exists() else None
+        if path is None:
+            # Fallback to any older files if needed
+            path = output_files.latest(REPO_ROOT, "mindful_tech_simple_output_*.md")
+        return latest_file_response(raw, path, "# No blog found yet\n\nRun the crew to generate one!")
     except Exception as e:
         return {"content": f"# Error loading blog\n\n{str(e)}"}
 
 
 @app.get("/latest-linkedin")
-async def get_latest_linkedin():
+async def get_latest_linkedin(raw: Request):
     try:
-        if LINKEDIN_PATH.exists():
-            content = LINKEDIN_PATH.read_text(encoding="utf-8", errors="ignore")
-            return {"content": content}
-        else:
-            return {"content": "# No LinkedIn post found yet\n\nRun the crew to generate one!"}
+        return latest_file_response(raw, LINKEDIN_PATH, "# No LinkedIn post found yet\n\nRun the crew to generate one!")
     except Exception as e:
         return {"content": f"# Error loading LinkedIn post\n\n{str(e)}"}
 
@@ -307,22 +1588,39 @@ async def get_latest_linkedin():
 # Memory API
 # --------------------
 
+def encode_cursor(row) -> str:
+    return f"{row['created_ts'] or 0}:{row['id']}"
+
+
+def decode_cursor(cursor: str) -> tuple:
+    created_ts, post_id = cursor.split(":", 1)
+    return int(created_ts), int(post_id)
+
+
 @app.get("/memory/list")
-async def list_posts(filter_type: Optional[str] = None, limit: int = 50, offset: int = 0):
+async def list_posts(raw: Request, filter_type: Optional[str] = None, limit: int = 50, offset: int = 0,
+                     cursor: Optional[str] = None):
+    # Pass back next_cursor to page on; offset still works but gets slower the deeper it goes
     try:
-        conn = get_db()
-        cur = conn.cursor()
-        query = "SELECT id, created_at, type, topic, title FROM posts"
+        query = "SELECT id, created_at, created_ts, type, topic, title FROM posts"
+        where: list = []
         params: list = []
         if filter_type:
             if filter_type not in ("blog", "linkedin"):
                 return {"error": "invalid type"}
-            query += " WHERE type = ?"
+            where.append("type = ?")
             params.append(filter_type)
-        query += " ORDER BY datetime(created_at) DESC LIMIT ? OFFSET ?"
+        if cursor:
+            try:
+                params.extend(decode_cursor(cursor))
+            except ValueError:
+                return {"error": "invalid cursor"}
+            where.append("(created_ts, id) < (?, ?)")
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY created_ts DESC, id DESC LIMIT ? OFFSET ?"
         params.extend([limit, offset])
-        cur.execute(query, params)
-        rows = cur.fetchall()
+        rows = await run_db(db_fetchall, query, params)
         posts = [
             {
                 "id": row["id"],
@@ -333,32 +1631,26 @@ async def list_posts(filter_type: Optional[str] = None, limit: int = 50, offset:
             }
             for row in rows
         ]
-        return {"posts": posts}
+        next_cursor = encode_cursor(rows[-1]) if rows and len(rows) == limit else None
+        return api_response(raw, {"posts": posts, "next_cursor": next_cursor})
     except Exception as e:
         return {"error": str(e)}
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
 
 
 @app.get("/memory/post/{post_id}")
-async def get_post(post_id: int):
+async def get_post(raw: Request, post_id: int):
     try:
-        conn = get_db()
-        cur = conn.cursor()
-        cur.execute(
+        row = await run_db(
+            db_fetchone,
             """
-            SELECT id, created_at, type, topic, title, content
+            SELECT id, created_at, type, topic, title, content, content_hash
             FROM posts WHERE id = ?
             """,
             (post_id,),
         )
-        row = cur.fetchone()
         if not row:
             return {"error": "Post not found"}
-        return {
+        post = {
             "id": row["id"],
             "created_at": row["created_at"],
             "type": row["type"],
@@ -366,33 +1658,26 @@ async def get_post(post_id: int):
             "title": row["title"],
             "content": row["content"],
         }
+        return api_response(raw, post, post_etag(row))
     except Exception as e:
         return {"error": str(e)}
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
 
 
 @app.get("/memory/latest")
-async def get_latest_post(filter_type: Optional[str] = None):
+async def get_latest_post(raw: Request, filter_type: Optional[str] = None):
     try:
-        conn = get_db()
-        cur = conn.cursor()
-        query = "SELECT id, created_at, type, topic, title, content FROM posts"
+        query = "SELECT id, created_at, type, topic, title, content, content_hash FROM posts"
         params: list = []
         if filter_type:
             if filter_type not in ("blog", "linkedin"):
                 return {"error": "invalid type"}
             query += " WHERE type = ?"
             params.append(filter_type)
-        query += " ORDER BY datetime(created_at) DESC LIMIT 1"
-        cur.execute(query, params)
-        row = cur.fetchone()
+        query += " ORDER BY created_ts DESC, id DESC LIMIT 1"
+        row = await run_db(db_fetchone, query, params)
         if not row:
             return {"error": "No posts found"}
-        return {
+        post = {
             "id": row["id"],
             "created_at": row["created_at"],
             "type": row["type"],
@@ -400,33 +1685,103 @@ async def get_latest_post(filter_type: Optional[str] = None):
             "title": row["title"],
             "content": row["content"],
         }
+        return api_response(raw, post, post_etag(row))
     except Exception as e:
         return {"error": str(e)}
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
 
 
-@app.get("/memory/search")
-async def search_posts(q: str, limit: int = 50):
-    try:
-        conn = get_db()
-        cur = conn.cursor()
-        # Join FTS to base table to retrieve metadata
-        cur.execute(
+_QUERY_TERM_RE = re.compile(r'"([^"]*)"|(\w+)')
+SEARCH_MODES = ("relevance", "recent", "hybrid")
+# bm25 column weights: title, content, topic
+BM25_ARGS = "5.0, 1.0, 2.0"
+BM25_WEIGHTS = f"bm25(posts_fts, {BM25_ARGS})"
+
+
+def build_match_query(q: str, prefix: bool = True, any_term: bool = False) -> Optional[str]:
+    # Raw input straight into MATCH breaks on quotes, dashes, AND/OR/NEAR, column filters...
+    # Rebuild it from plain words: "quoted phrases" stay phrases, every term is quoted,
+    # and the last bare word gets * so results show up while the user is still typing.
+    trigram = fts_tokenizer() == "trigram"
+    terms = []
+    for phrase, word in _QUERY_TERM_RE.findall(q):
+        words = re.findall(r"\w+", phrase) if phrase else [word]
+        if trigram:
+            words = [w for w in words if len(w) >= 3]  # shorter words can never match a trigram index
+        if words:
+            terms.append(('"' + " ".join(words) + '"', bool(phrase)))
+    if not terms:
+        return None
+    if prefix and not trigram and not terms[-1][1]:
+        terms[-1] = (terms[-1][0] + "*", False)
+    return (" OR " if any_term else " ").join(term for term, _ in terms)
+
+
+def search_memory(match: str, mode: str, limit: int) -> list:
+    conn = get_db()
+    if mode == "relevance":
+        # ORDER BY rank is sorted inside FTS5, so snippet() only runs for the rows returned
+        return conn.execute(
             """
-            SELECT p.id, p.created_at, p.type, p.topic, p.title
-            FROM posts_fts f
-            JOIN posts p ON p.id = f.rowid
-            WHERE f MATCH ?
-            ORDER BY datetime(p.created_at) DESC
+            SELECT p.id, p.created_at, p.type, p.topic, p.title, posts_fts.rank AS score,
+                   snippet(posts_fts, 1, '<mark>', '</mark>', '…', 24) AS snippet,
+                   highlight(posts_fts, 0, '<mark>', '</mark>') AS title_highlight
+            FROM posts_fts
+            JOIN posts p ON p.id = posts_fts.rowid
+            WHERE posts_fts MATCH ? AND posts_fts.rank MATCH ?
+            ORDER BY posts_fts.rank
             LIMIT ?
             """,
-            (q, limit),
+            (match, f"bm25({BM25_ARGS})", limit),
+        ).fetchall()
+
+    if mode == "recent":
+        order = "p.created_ts DESC, p.id DESC"
+    else:
+        # bm25 is negative (lower = better); halve it towards 0 for every half-life of age
+        order = (
+            f"{BM25_WEIGHTS} * pow(0.5, MAX(0, CAST(strftime('%s', 'now') AS INTEGER) - COALESCE(p.created_ts, 0))"
+            f" / 86400.0 / {MEMORY_SEARCH_HALF_LIFE_DAYS})"
         )
-        rows = cur.fetchall()
+    ranked = conn.execute(
+        f"""
+        SELECT p.id, {BM25_WEIGHTS} AS score
+        FROM posts_fts
+        JOIN posts p ON p.id = posts_fts.rowid
+        WHERE posts_fts MATCH ?
+        ORDER BY {order}
+        LIMIT ?
+        """,
+        (match, limit),
+    ).fetchall()
+    if not ranked:
+        return []
+    # Second pass builds snippets for the page of results only
+    ids = [row["id"] for row in ranked]
+    placeholders = ",".join("?" * len(ids))
+    rows = conn.execute(
+        f"""
+        SELECT p.id, p.created_at, p.type, p.topic, p.title,
+               snippet(posts_fts, 1, '<mark>', '</mark>', '…', 24) AS snippet,
+               highlight(posts_fts, 0, '<mark>', '</mark>') AS title_highlight
+        FROM posts_fts
+        JOIN posts p ON p.id = posts_fts.rowid
+        WHERE posts_fts MATCH ? AND posts_fts.rowid IN ({placeholders})
+        """,
+        [match, *ids],
+    ).fetchall()
+    by_id = {row["id"]: row for row in rows}
+    return [{**dict(by_id[r["id"]]), "score": r["score"]} for r in ranked if r["id"] in by_id]
+
+
+@app.get("/memory/search")
+async def search_posts(raw: Request, q: str, limit: int = 50, mode: str = "relevance", prefix: bool = True):
+    try:
+        if mode not in SEARCH_MODES:
+            return {"error": "invalid mode"}
+        match = build_match_query(q, prefix=prefix)
+        if match is None:
+            return {"posts": []}
+        rows = await run_db(search_memory, match, mode, limit)
         posts = [
             {
                 "id": row["id"],
@@ -434,34 +1789,41 @@ async def search_posts(q: str, limit: int = 50):
                 "type": row["type"],
                 "topic": row["topic"],
                 "title": row["title"],
+                "title_highlight": row["title_highlight"],
+                "snippet": row["snippet"],
+                "score": row["score"],
             }
             for row in rows
         ]
-        return {"posts": posts}
+        return api_response(raw, {"posts": posts})
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@app.get("/memory/semantic-search")
+async def semantic_search_posts(q: Optional[str] = None, similar_to: Optional[int] = None, limit: int = 20):
+    # Fuses embedding similarity with bm25; similar_to=<post id> finds near-duplicates of a post
+    try:
+        if not MEMORY_SEMANTIC:
+            return {"error": "semantic search is disabled (MEMORY_SEMANTIC=0)"}
+        if not (q and q.strip()) and similar_to is None:
+            return {"error": "q or similar_to is required"}
+        return await semantic_search(q, similar_to, limit)
     except Exception as e:
         return {"error": str(e)}
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
 
 
 @app.get("/memory/topics")
 async def list_topics():
     try:
-        conn = get_db()
-        cur = conn.cursor()
-        cur.execute(
+        rows = await run_db(
+            db_fetchall,
             """
-            SELECT topic, COUNT(*) as count
-            FROM posts
-            WHERE topic IS NOT NULL AND topic != ''
-            GROUP BY topic
+            SELECT topic, count
+            FROM topic_counts
             ORDER BY count DESC, topic ASC
-            """
+            """,
         )
-        rows = cur.fetchall()
         return {
             "topics": [
                 {"topic": row["topic"], "count": row["count"]} for row in rows
@@ -469,8 +1831,3 @@ async def list_topics():
         }
     except Exception as e:
         return {"error": str(e)}
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
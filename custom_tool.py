@@ -1,8 +1,8 @@
 # custom_tool.py
 from crewai import BaseTool  # ← This is the correct import
 from pydantic import BaseModel, Field
-import requests
-from bs4 import BeautifulSoup
+from html_extract import COMPACT, extract_text
+from page_cache import fetch_page
 
 class ScrapeWebsiteInput(BaseModel):
     url: str = Field(..., description="The URL to scrape")
@@ -15,14 +15,7 @@ class LocalWebScraperTool(BaseTool):
     def _run(self, url: str) -> str:
         try:
             headers = {"User-Agent": "Mozilla/5.0"}
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            for element in soup(["script", "style", "nav", "footer"]):
-                element.decompose()
-
-            text = ' '.join([p.get_text(strip=True) for p in soup.find_all(['p', 'h1', 'h2'])])
-            return text[:2000]
+            page = fetch_page(url, headers=headers, timeout=10)
+            return extract_text(page.content, COMPACT)
         except Exception as e:
             return f"Error: {str(e)}"
\ No newline at end of file
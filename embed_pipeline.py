@@ -0,0 +1,113 @@
+# embed_pipeline.py
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+from llama_index.core import Settings, VectorStoreIndex
+from llama_index.core.node_parser import SentenceSplitter
+from llama_index.core.schema import MetadataMode
+
+# Set per worker process by _init_worker
+_worker_model = None
+
+
+def _init_worker(model_name: str, threads: int, batch_size: int):
+    global _worker_model
+    # Give each worker a slice of the cores instead of letting every torch runtime grab all of them
+    import torch
+    torch.set_num_threads(threads)
+    from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+    from embedding_cache import CachedEmbedding
+    # Chunks already embedded by an earlier build are served from the shared on-disk cache
+    _worker_model = CachedEmbedding(HuggingFaceEmbedding(model_name=model_name, embed_batch_size=batch_size))
+
+
+def _count_tokens(texts: list) -> int:
+    tokenizer = getattr(getattr(_worker_model.inner, "_model", None), "tokenizer", None)
+    if tokenizer is None:
+        return sum(len(t.split()) for t in texts)
+    return sum(len(ids) for ids in tokenizer(texts, add_special_tokens=False)["input_ids"])
+
+
+def _embed_batch(batch_id: int, texts: list):
+    vectors = _worker_model.get_text_embedding_batch(texts)
+    return batch_id, vectors, _count_tokens(texts)
+
+
+@dataclass
+class ThroughputReport:
+    chunks: int = 0
+    tokens: int = 0
+    batches: int = 0
+    workers: int = 0
+    seconds: float = 0.0
+
+    @property
+    def chunks_per_s(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+    @property
+    def tokens_per_s(self) -> float:
+        return self.tokens / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.chunks} chunks / {self.tokens} tokens in {self.seconds:.1f}s "
+            f"({self.chunks_per_s:.1f} chunks/s, {self.tokens_per_s:.0f} tokens/s, "
+            f"{self.batches} batches, {self.workers} workers)"
+        )
+
+
+def make_batches(nodes: list, batch_size: int) -> list:
+    # Neighbouring chunks of similar length pad to almost the same sequence length
+    order = sorted(range(len(nodes)), key=lambda i: len(nodes[i].get_content(metadata_mode=MetadataMode.EMBED)))
+    return [[nodes[i] for i in order[start:start + batch_size]] for start in range(0, len(order), batch_size)]
+
+
+def embed_nodes(nodes: list, model_name: str, workers: int | None = None, batch_size: int = 64,
+                on_batch=None, verbose: bool = True) -> ThroughputReport:
+    """Embed nodes across a process pool, calling on_batch(nodes) as each batch finishes."""
+    workers = workers or os.cpu_count() or 1
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    batches = make_batches(nodes, batch_size)
+    report = ThroughputReport(workers=workers)
+
+    started = time.perf_counter()
+    # spawn: forking a process that already imported torch can deadlock its thread pools
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                             initargs=(model_name, threads, batch_size)) as pool:
+        futures = [
+            pool.submit(_embed_batch, batch_id, [n.get_content(metadata_mode=MetadataMode.EMBED) for n in batch])
+            for batch_id, batch in enumerate(batches)
+        ]
+        for future in as_completed(futures):
+            batch_id, vectors, tokens = future.result()
+            batch = batches[batch_id]
+            for node, vector in zip(batch, vectors):
+                node.embedding = vector
+            if on_batch is not None:
+                on_batch(batch)
+
+            report.chunks += len(batch)
+            report.tokens += tokens
+            report.batches += 1
+            report.seconds = time.perf_counter() - started
+            if verbose and (report.batches % 10 == 0 or report.batches == len(batches)):
+                print(f"⚙️  Embedded {report.batches}/{len(batches)} batches — {report}")
+
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def build_index_parallel(documents: list, model_name: str, storage_context, workers: int | None = None,
+                         batch_size: int = 64, node_parser=None):
+    # Chunk in the parent, embed in the pool, and stream finished batches into the store
+    node_parser = node_parser or Settings.node_parser or SentenceSplitter()
+    nodes = node_parser.get_nodes_from_documents(documents)
+    index = VectorStoreIndex(nodes=[], storage_context=storage_context)
+    # Nodes arrive with embeddings already set, so insert_nodes only writes them
+    report = embed_nodes(nodes, model_name, workers=workers, batch_size=batch_size, on_batch=index.insert_nodes)
+    return index, report
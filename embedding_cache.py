@@ -0,0 +1,216 @@
+# embedding_cache.py
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from typing import Any, List, Optional
+
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.bridge.pydantic import PrivateAttr
+
+# Kept out of ./storage on purpose: the index cache watches that dir for changes
+DEFAULT_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite")
+DEFAULT_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "100000"))
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def text_key(kind: str, text: str) -> str:
+    # Query and document embeddings differ for instruction-tuned models (e.g. bge), so kind is part of the key
+    return hashlib.sha256(f"{kind}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite-backed embedding cache keyed by (model id, normalized text hash) with LRU eviction."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # Several embedding worker processes may share the file
+        self._conn.execute("PRAGMA journal_mode=WAL;")
+        self._conn.execute("PRAGMA busy_timeout=10000;")
+        self._conn.execute("PRAGMA synchronous=NORMAL;")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                key TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, key)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def get_many(self, model: str, keys: List[str]) -> dict:
+        if not keys:
+            return {}
+        found = {}
+        with self._lock:
+            # Chunk to stay under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE model = ? AND key IN ({placeholders})",
+                    [model, *chunk],
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND key = ?",
+                    [(now, model, key) for key in found],
+                )
+                self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(set(keys)) - len(found)
+        return found
+
+    def put_many(self, model: str, items: dict):
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            cur = self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, key, vector, last_used) VALUES (?, ?, ?, ?)",
+                [(model, key, array("f", vector).tobytes(), now) for key, vector in items.items()],
+            )
+            self._count += max(cur.rowcount, 0)
+            if self._count > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        # Re-count first: other processes may have written to the same file
+        self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        excess = self._count - int(self.max_entries * 0.9)
+        if excess <= 0:
+            return
+        # Drop the least recently used tenth in one go rather than one row per insert
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE (model, key) IN "
+            "(SELECT model, key FROM embeddings ORDER BY last_used LIMIT ?)",
+            (excess,),
+        )
+        self.evictions += excess
+        self._count -= excess
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": self._count,
+            "evictions": self.evictions,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_cache: Optional[EmbeddingCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def default_cache() -> EmbeddingCache:
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = EmbeddingCache()
+        return _default_cache
+
+
+class CachedEmbedding(BaseEmbedding):
+    """Wraps any llama_index embedding model and consults the on-disk cache before running it."""
+
+    _inner: BaseEmbedding = PrivateAttr()
+    _cache: EmbeddingCache = PrivateAttr()
+    _model_id: str = PrivateAttr()
+
+    def __init__(self, inner: BaseEmbedding, cache: Optional[EmbeddingCache] = None, **kwargs: Any):
+        super().__init__(model_name=inner.model_name, embed_batch_size=inner.embed_batch_size, **kwargs)
+        self._inner = inner
+        self._cache = cache or default_cache()
+        self._model_id = f"{type(inner).__name__}:{inner.model_name}"
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedEmbedding"
+
+    @property
+    def inner(self) -> BaseEmbedding:
+        return self._inner
+
+    @property
+    def cache(self) -> EmbeddingCache:
+        return self._cache
+
+    def _lookup(self, kind: str, texts: List[str], compute) -> List[List[float]]:
+        keys = [text_key(kind, t) for t in texts]
+        found = self._cache.get_many(self._model_id, keys)
+        missing = [i for i, key in enumerate(keys) if key not in found]
+        if missing:
+            computed = compute([texts[i] for i in missing])
+            fresh = {keys[i]: vector for i, vector in zip(missing, computed)}
+            self._cache.put_many(self._model_id, fresh)
+            found.update(fresh)
+        return [found[key] for key in keys]
+
+    async def _alookup(self, kind: str, texts: List[str], acompute) -> List[List[float]]:
+        keys = [text_key(kind, t) for t in texts]
+        found = self._cache.get_many(self._model_id, keys)
+        missing = [i for i, key in enumerate(keys) if key not in found]
+        if missing:
+            computed = await acompute([texts[i] for i in missing])
+            fresh = {keys[i]: vector for i, vector in zip(missing, computed)}
+            self._cache.put_many(self._model_id, fresh)
+            found.update(fresh)
+        return [found[key] for key in keys]
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self._lookup("query", [query], lambda qs: [self._inner.get_query_embedding(qs[0])])[0]
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        async def compute(qs):
+            return [await self._inner.aget_query_embedding(qs[0])]
+        return (await self._alookup("query", [query], compute))[0]
+
+    def get_query_embedding_batch(self, queries: List[str]) -> List[List[float]]:
+        # llama_index has no batched query API; HuggingFaceEmbedding._embed takes a list in one forward pass.
+        # It may apply the query instruction differently from get_query_embedding, so its vectors are
+        # cached under their own kind and never mixed with the single-query ones.
+        embed = getattr(self._inner, "_embed", None)
+        if embed is None:
+            return [self._get_query_embedding(q) for q in queries]
+        return self._lookup("query_batch", queries, lambda qs: embed(qs, prompt_name="query"))
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._lookup("text", [text], self._inner.get_text_embedding_batch)[0]
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return self._lookup("text", texts, self._inner.get_text_embedding_batch)
+
+    async def _aget_text_embedding(self, text: str) -> List[float]:
+        return (await self._alookup("text", [text], self._inner.aget_text_embedding_batch))[0]
+
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return await self._alookup("text", texts, self._inner.aget_text_embedding_batch)
@@ -0,0 +1,143 @@
+# html_extract.py
+import os
+import re
+from dataclasses import dataclass
+from typing import Optional, Union
+
+# lxml is optional: without it every call goes through the BeautifulSoup path
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+# HTML_EXTRACT_ENGINE=bs4 forces the old BeautifulSoup path (e.g. to compare output)
+DEFAULT_ENGINE = os.getenv("HTML_EXTRACT_ENGINE", "lxml" if etree is not None else "bs4")
+CHUNK_SIZE = 16 * 1024
+
+_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([A-Za-z0-9_.:-]+)""", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class ExtractProfile:
+    tags: frozenset
+    drop: frozenset
+    min_len: Optional[int]  # keep elements whose text is longer than this; None keeps empty ones too
+    sep: str
+    max_chars: int
+
+
+# tools.py / batch_scraper.py
+ARTICLE = ExtractProfile(
+    tags=frozenset({"p", "h1", "h2", "h3"}),
+    drop=frozenset({"script", "style", "nav", "footer", "aside", "header", "form"}),
+    min_len=20, sep="\n", max_chars=4000,
+)
+# custom_tool.py::LocalWebScraperTool
+COMPACT = ExtractProfile(
+    tags=frozenset({"p", "h1", "h2"}),
+    drop=frozenset({"script", "style", "nav", "footer"}),
+    min_len=None, sep=" ", max_chars=2000,
+)
+# crew_mindful.py::scrape_mindful_site
+PARAGRAPHS = ExtractProfile(
+    tags=frozenset({"p"}),
+    drop=frozenset({"script", "style", "nav", "footer", "aside"}),
+    min_len=50, sep="\n", max_chars=4000,
+)
+PROFILES = {"article": ARTICLE, "compact": COMPACT, "paragraphs": PARAGRAPHS}
+
+
+def _keep(text: str, profile: ExtractProfile) -> bool:
+    return profile.min_len is None or len(text) > profile.min_len
+
+
+def extract_text_bs4(html: Union[bytes, str], profile: ExtractProfile = ARTICLE) -> str:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    for element in soup(list(profile.drop)):
+        element.decompose()
+    texts = (element.get_text(strip=True) for element in soup.find_all(list(profile.tags)))
+    return profile.sep.join(t for t in texts if _keep(t, profile))[:profile.max_chars]
+
+
+def _sniff_encoding(html: bytes) -> str:
+    # libxml2 assumes Latin-1 for undeclared HTML; html.parser/bs4 would have guessed UTF-8
+    if html.startswith(b"\xef\xbb\xbf"):
+        return "utf-8"
+    match = _CHARSET_RE.search(html[:4096])
+    return match.group(1).decode("ascii") if match else "utf-8"
+
+
+def extract_text_lxml(html: Union[bytes, str], profile: ExtractProfile = ARTICLE) -> str:
+    """Single streaming pass over the document that stops once max_chars of text is collected."""
+    if isinstance(html, bytes):
+        parser = etree.HTMLPullParser(events=("start", "end"), encoding=_sniff_encoding(html),
+                                      remove_comments=True, remove_pis=True)
+    else:
+        parser = etree.HTMLPullParser(events=("start", "end"), remove_comments=True, remove_pis=True)
+
+    # One slot per matched element in start-tag order, so nested matches come out like find_all()
+    slots: list = []
+    open_slots: dict = {}
+    drop_depth = 0
+    collected = 0
+
+    def handle(events) -> bool:
+        nonlocal drop_depth, collected
+        for event, el in events:
+            tag = el.tag
+            if event == "start":
+                if tag in profile.drop:
+                    drop_depth += 1
+                elif tag in profile.tags and not drop_depth:
+                    open_slots[el] = len(slots)
+                    slots.append(None)
+                continue
+
+            if tag in profile.drop:
+                drop_depth -= 1
+                # Same as decompose(): lose the subtree but keep the text that follows it
+                el.text = None
+                del el[:]
+            elif el in open_slots:
+                text = "".join(s.strip() for s in el.itertext())
+                if _keep(text, profile):
+                    slots[open_slots[el]] = text
+                    collected += len(text) + len(profile.sep)
+                del open_slots[el]
+
+            if not open_slots and not drop_depth:
+                # Nothing above us needs this subtree any more; free it as we go
+                el.clear(keep_tail=True)
+                parent = el.getparent()
+                if parent is not None:
+                    while el.getprevious() is not None:
+                        del parent[0]
+                if collected >= profile.max_chars + len(profile.sep):
+                    return True
+        return False
+
+    done = False
+    for start in range(0, len(html), CHUNK_SIZE):
+        parser.feed(html[start:start + CHUNK_SIZE])
+        if handle(parser.read_events()):
+            done = True
+            break
+    if not done:
+        try:
+            parser.close()
+        except etree.XMLSyntaxError:
+            pass  # empty or hopeless input; keep whatever we collected
+        handle(parser.read_events())
+
+    return profile.sep.join(s for s in slots if s is not None)[:profile.max_chars]
+
+
+def extract_text(html: Union[bytes, str], profile: Union[ExtractProfile, str] = ARTICLE,
+                 engine: Optional[str] = None) -> str:
+    if isinstance(profile, str):
+        profile = PROFILES[profile]
+    if (engine or DEFAULT_ENGINE) == "lxml" and etree is not None:
+        return extract_text_lxml(html, profile)
+    return extract_text_bs4(html, profile)
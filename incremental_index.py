@@ -0,0 +1,105 @@
+# incremental_index.py
+import hashlib
+import json
+import os
+
+from llama_index.core import SimpleDirectoryReader, StorageContext, VectorStoreIndex, load_index_from_storage
+
+from mmap_vector_store import MmapVectorStore, load_storage_context
+
+MANIFEST_NAME = "ingest_manifest.json"
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def scan_files(data_dir: str, recursive: bool = False) -> dict:
+    # Same file selection as SimpleDirectoryReader's defaults: hidden files skipped, top level only
+    hashes = {}
+    for root, dirs, files in os.walk(data_dir):
+        dirs[:] = [d for d in dirs if recursive and not d.startswith(".")]
+        for name in files:
+            if name.startswith("."):
+                continue
+            path = os.path.join(root, name)
+            hashes[os.path.relpath(path, data_dir)] = file_hash(path)
+    return hashes
+
+
+def load_manifest(persist_dir: str) -> dict:
+    path = os.path.join(persist_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("files", {})
+
+
+def save_manifest(persist_dir: str, files: dict):
+    os.makedirs(persist_dir, exist_ok=True)
+    path = os.path.join(persist_dir, MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "files": files}, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def open_or_create_index(persist_dir: str, embed_model=None, fresh: bool = False) -> VectorStoreIndex:
+    if not fresh and os.path.exists(os.path.join(persist_dir, "docstore.json")):
+        return load_index_from_storage(load_storage_context(persist_dir), embed_model=embed_model)
+    storage_context = StorageContext.from_defaults(vector_store=MmapVectorStore())
+    return VectorStoreIndex(nodes=[], storage_context=storage_context, embed_model=embed_model)
+
+
+def refresh_index(data_dir: str = "data", persist_dir: str = "./storage", embed_model=None,
+                  recursive: bool = False) -> dict:
+    """Bring the index in persist_dir in line with data_dir, embedding only new or changed files.
+
+    The manifest in persist_dir records path -> content hash -> doc/node ids, so
+    unchanged files are never re-read or re-embedded and removed files have
+    their nodes deleted.
+    """
+    manifest = load_manifest(persist_dir)
+    current = scan_files(data_dir, recursive=recursive)
+
+    added = sorted(set(current) - set(manifest))
+    removed = sorted(set(manifest) - set(current))
+    changed = sorted(p for p in set(current) & set(manifest) if current[p] != manifest[p]["hash"])
+    stats = {"added": len(added), "changed": len(changed), "removed": len(removed),
+             "unchanged": len(current) - len(added) - len(changed), "nodes_embedded": 0}
+
+    if not (added or changed or removed):
+        return stats
+
+    # Without a manifest we can't tell which stored nodes belong to which file, so start over
+    index = open_or_create_index(persist_dir, embed_model=embed_model, fresh=not manifest)
+
+    for rel in removed + changed:
+        for doc_id in manifest[rel].get("doc_ids", []):
+            index.delete_ref_doc(doc_id, delete_from_docstore=True)
+        manifest.pop(rel)
+
+    for rel in added + changed:
+        path = os.path.join(data_dir, rel)
+        documents = SimpleDirectoryReader(input_files=[path]).load_data()
+        node_ids = []
+        for doc in documents:
+            index.insert(doc)
+            ref_info = index.docstore.get_ref_doc_info(doc.doc_id)
+            if ref_info is not None:
+                node_ids.extend(ref_info.node_ids)
+        manifest[rel] = {
+            "hash": current[rel],
+            "doc_ids": [doc.doc_id for doc in documents],
+            "node_ids": node_ids,
+        }
+        stats["nodes_embedded"] += len(node_ids)
+
+    # The mmap store appends new rows and tombstones removed ones instead of rewriting the matrix
+    index.storage_context.persist(persist_dir=persist_dir)
+    save_manifest(persist_dir, manifest)
+    return stats
@@ -0,0 +1,120 @@
+# index_cache.py
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+from llama_index.core import load_index_from_storage
+
+from mmap_vector_store import load_storage_context
+
+
+def fingerprint(persist_dir: str) -> tuple:
+    """Cheap change detector for a persist dir: (name, mtime_ns, size) of every file."""
+    entries = []
+    for root, _, files in os.walk(persist_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((os.path.relpath(path, persist_dir), st.st_mtime_ns, st.st_size))
+    return tuple(sorted(entries))
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    loads: int = 0
+    load_seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "load_seconds": round(self.load_seconds, 4),
+            "avg_load_seconds": round(self.load_seconds / self.loads, 4) if self.loads else 0.0,
+        }
+
+
+@dataclass
+class _Entry:
+    fingerprint: tuple
+    index: object
+    query_engines: dict = field(default_factory=dict)
+
+
+class IndexCache:
+    """Process-wide cache of loaded indexes and query engines, keyed by persist dir.
+
+    An entry is reused until the files under its persist dir change, so a crew
+    doing many lookups pays the storage load once instead of on every call.
+    """
+
+    def __init__(self):
+        self._entries: dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        # One lock per persist dir so a slow load doesn't block other indexes
+        self._load_locks: dict[str, threading.Lock] = {}
+        self.stats = CacheStats()
+
+    def _load_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._load_locks.setdefault(key, threading.Lock())
+
+    def get_index(self, persist_dir: str):
+        return self._get_entry(persist_dir).index
+
+    def get_query_engine(self, persist_dir: str, **engine_kwargs):
+        entry = self._get_entry(persist_dir)
+        key = tuple(sorted(engine_kwargs.items()))
+        with self._lock:
+            engine = entry.query_engines.get(key)
+            if engine is None:
+                engine = entry.index.as_query_engine(**engine_kwargs)
+                entry.query_engines[key] = engine
+            return engine
+
+    def _get_entry(self, persist_dir: str) -> _Entry:
+        key = os.path.abspath(persist_dir)
+        current = fingerprint(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.fingerprint == current:
+                self.stats.hits += 1
+                return entry
+
+        with self._load_lock(key):
+            # Another thread may have reloaded while we waited
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry.fingerprint == current:
+                    self.stats.hits += 1
+                    return entry
+                self.stats.misses += 1
+
+            started = time.perf_counter()
+            storage_context = load_storage_context(key)
+            index = load_index_from_storage(storage_context)
+            elapsed = time.perf_counter() - started
+
+            entry = _Entry(fingerprint=current, index=index)
+            with self._lock:
+                self._entries[key] = entry
+                self.stats.loads += 1
+                self.stats.load_seconds += elapsed
+            return entry
+
+    def invalidate(self, persist_dir: str | None = None):
+        with self._lock:
+            if persist_dir is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(persist_dir), None)
+
+
+# Shared instance used by the tools and scripts
+index_cache = IndexCache()
@@ -0,0 +1,175 @@
+# llm_cache.py
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+# Opt-in: LLM_CACHE=1 turns it on for every entry point that goes through ollama_client
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "0") == "1"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm_responses.sqlite")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+# Sampled (temperature > 0) calls are bypassed unless this is set, since replaying them changes behaviour
+LLM_CACHE_SAMPLED = os.getenv("LLM_CACHE_SAMPLED", "0") == "1"
+
+
+def request_key(model: str, messages: list, params: Optional[dict] = None) -> str:
+    canonical = json.dumps(
+        {"model": model, "params": params or {}, "messages": messages},
+        sort_keys=True, ensure_ascii=False, separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Content-addressed SQLite cache of LLM responses with TTL and size-based eviction."""
+
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl: float = LLM_CACHE_TTL,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES, cache_sampled: bool = LLM_CACHE_SAMPLED):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.cache_sampled = cache_sampled
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL;")
+        self._conn.execute("PRAGMA busy_timeout=5000;")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used)")
+        self._conn.commit()
+
+    def should_cache(self, temperature: Optional[float], record: bool = True) -> bool:
+        # Unknown temperature means the server default (0.8 for Ollama), i.e. sampled
+        if self.cache_sampled or temperature == 0:
+            return True
+        if record:
+            self.bypassed += 1
+        return False
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT content, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, model: str, content: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, content, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, model, content, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        cur = self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+        self.evictions += max(cur.rowcount, 0)
+        excess = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+            self.evictions += excess
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+_default_cache: Optional[LLMCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def default_llm_cache() -> Optional[LLMCache]:
+    global _default_cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LLMCache()
+        return _default_cache
+
+
+# --------------------
+# LangChain adapter (ChatOllama-based crews)
+# --------------------
+
+_TEMPERATURE_RE = re.compile(r"""['"]temperature['"]\s*[,:]\s*([0-9.eE+-]+)""")
+
+
+def install_langchain_cache(cache: Optional[LLMCache] = None) -> Optional[LLMCache]:
+    cache = cache or default_llm_cache()
+    if cache is None:
+        return None
+
+    from langchain_core.caches import BaseCache
+    from langchain_core.globals import set_llm_cache
+    from langchain_core.load import dumps, loads
+
+    class _LangChainCache(BaseCache):
+        # llm_string is LangChain's serialized model + params, so it already covers model and sampling params
+        def _key(self, prompt: str, llm_string: str, record: bool = True) -> Optional[str]:
+            match = _TEMPERATURE_RE.search(llm_string)
+            if not cache.should_cache(float(match.group(1)) if match else None, record=record):
+                return None
+            return request_key(llm_string, [prompt])
+
+        def lookup(self, prompt: str, llm_string: str):
+            key = self._key(prompt, llm_string)
+            if key is None:
+                return None
+            cached = cache.get(key)
+            return [loads(g) for g in json.loads(cached)] if cached is not None else None
+
+        def update(self, prompt: str, llm_string: str, return_val):
+            key = self._key(prompt, llm_string, record=False)
+            if key is not None:
+                cache.put(key, llm_string[:200], json.dumps([dumps(g) for g in return_val]))
+
+        def clear(self, **kwargs):
+            cache.clear()
+
+    set_llm_cache(_LangChainCache())
+    return cache
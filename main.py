@@ -1,29 +1,36 @@
 # main.py
-import requests
+from ollama_client import OllamaError, get_client, user_message
 
 def chat_with_qwen(prompt):
-    url = "http://localhost:11434/api/chat"
-    payload = {
-        "model": "qwen:7b",
-        "stream": False,  # force Ollama to send one JSON object
-        "messages": [
-            {"role": "user", "content": prompt}
-        ]
-    }
+    # Shared keep-alive client with timeouts, retries and a per-model concurrency limit
+    try:
+        return get_client().chat("qwen:7b", user_message(prompt))
+    except OllamaError as e:
+        return f"Error connecting to Ollama: {e}"
 
+
+async def achat_with_qwen(prompt):
     try:
-        response = requests.post(url, json=payload)
-        response.raise_for_status()
-        data = response.json()
-
-        if "message" in data and "content" in data["message"]:
-            return data["message"]["content"]
-        else:
-            return data
-    except requests.exceptions.RequestException as e:
+        return await get_client().achat("qwen:7b", user_message(prompt))
+    except OllamaError as e:
         return f"Error connecting to Ollama: {e}"
 
+
+def stream_qwen(prompt):
+    # Iterate for tokens as they arrive; stream.stats has TTFT and tokens/s once it finishes
+    return get_client().stream_chat("qwen:7b", user_message(prompt))
+
+
+def astream_qwen(prompt):
+    return get_client().astream_chat("qwen:7b", user_message(prompt))
+
 if __name__ == "__main__":
     prompt = "Say hello from Qwen"
-    answer = chat_with_qwen(prompt)
-    print("Qwen says:", answer)
\ No newline at end of file
+    print("Qwen says: ", end="", flush=True)
+    stream = stream_qwen(prompt)
+    try:
+        for token in stream:
+            print(token, end="", flush=True)
+        print(f"\n⏱️  {stream.stats}")
+    except OllamaError as e:
+        print(f"Error connecting to Ollama: {e}")
\ No newline at end of file
@@ -0,0 +1,359 @@
+# mmap_vector_store.py
+import json
+import os
+import sys
+from typing import Any, List, Optional
+
+import numpy as np
+from llama_index.core import StorageContext
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.schema import BaseNode
+from ann_index import ANN_SUFFIX, DEFAULT_NPROBE, IVFIndex
+from llama_index.core.vector_stores.types import (
+    BasePydanticVectorStore,
+    FilterCondition,
+    FilterOperator,
+    MetadataFilters,
+    VectorStoreQuery,
+    VectorStoreQueryMode,
+    VectorStoreQueryResult,
+)
+
+# Same namespace llama_index uses for the default JSON store, so both can live in one persist dir
+DEFAULT_STORE_NAME = "default__vector_store"
+MATRIX_SUFFIX = ".f32"
+META_SUFFIX = ".meta.json"
+# Rewrite the matrix once more than this fraction of rows are tombstoned
+COMPACT_RATIO = 0.25
+# Re-cluster the ANN index once this fraction of rows was appended after it was built
+ANN_REBUILD_RATIO = 0.2
+
+
+def _store_base(persist_path: str) -> str:
+    # StorageContext.persist hands us ".../default__vector_store.json"
+    return persist_path[:-5] if persist_path.endswith(".json") else persist_path
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    # Rows are stored unit-length so cosine similarity is a plain dot product at query time
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32, copy=False)
+
+
+class MmapVectorStore(BasePydanticVectorStore):
+    """Vector store backed by a contiguous float32 matrix file opened with mmap.
+
+    Layout next to the other llama_index files in the persist dir:
+      default__vector_store.f32        row-major float32 matrix, one unit-length row per node
+      default__vector_store.meta.json  dim, node ids, ref doc ids, per-node metadata, tombstones
+
+    Persisting appends new rows to the matrix file; deleted rows are tombstoned
+    and only dropped when the store is compacted.
+
+    If build_ann() was called, an IVF index (default__vector_store.ivf.npz) is
+    kept next to the matrix and queries only score the probed lists plus any
+    rows appended since it was built.
+    """
+
+    stores_text: bool = False
+    is_embedding_query: bool = True
+    use_ann: bool = True
+
+    _dim: Optional[int] = PrivateAttr(default=None)
+    _matrix: Optional[np.ndarray] = PrivateAttr(default=None)
+    _tail: List[np.ndarray] = PrivateAttr(default_factory=list)
+    _stacked: Optional[np.ndarray] = PrivateAttr(default=None)
+    _ids: List[str] = PrivateAttr(default_factory=list)
+    _ref_doc_ids: List[Optional[str]] = PrivateAttr(default_factory=list)
+    _metadata: List[dict] = PrivateAttr(default_factory=list)
+    _deleted: set = PrivateAttr(default_factory=set)
+    # Where the memmapped rows came from, so persist can append instead of rewriting
+    _disk_base: Optional[str] = PrivateAttr(default=None)
+    _disk_rows: int = PrivateAttr(default=0)
+    _ann: Optional[IVFIndex] = PrivateAttr(default=None)
+
+    @property
+    def client(self) -> Any:
+        return None
+
+    @property
+    def count(self) -> int:
+        return len(self._ids) - len(self._deleted)
+
+    # --------------------
+    # Loading
+    # --------------------
+
+    @classmethod
+    def from_persist_path(cls, persist_path: str) -> "MmapVectorStore":
+        base = _store_base(persist_path)
+        with open(base + META_SUFFIX, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        store = cls()
+        store._dim = meta["dim"]
+        store._ids = meta["ids"]
+        store._ref_doc_ids = meta["ref_doc_ids"]
+        store._metadata = meta["metadata"]
+        store._deleted = set(meta.get("deleted", []))
+        store._disk_base = os.path.abspath(base)
+        store._disk_rows = len(store._ids)
+        if store._ids:
+            store._matrix = np.memmap(
+                base + MATRIX_SUFFIX, dtype=np.float32, mode="r", shape=(len(store._ids), store._dim)
+            )
+        if os.path.exists(base + ANN_SUFFIX):
+            ann = IVFIndex.load(base + ANN_SUFFIX)
+            # An index that claims more rows than the store has belongs to an older matrix
+            store._ann = ann if ann.n_rows <= len(store._ids) else None
+        return store
+
+    @classmethod
+    def from_persist_dir(cls, persist_dir: str = "./storage") -> "MmapVectorStore":
+        return cls.from_persist_path(os.path.join(persist_dir, DEFAULT_STORE_NAME))
+
+    @classmethod
+    def from_json_store(cls, json_path: str) -> "MmapVectorStore":
+        with open(json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        store = cls()
+        embedding_dict = data.get("embedding_dict", {})
+        if embedding_dict:
+            ids = list(embedding_dict)
+            store._append(
+                ids,
+                np.asarray([embedding_dict[i] for i in ids], dtype=np.float32),
+                [data.get("text_id_to_ref_doc_id", {}).get(i) for i in ids],
+                [data.get("metadata_dict", {}).get(i) or {} for i in ids],
+            )
+        return store
+
+    # --------------------
+    # Writes
+    # --------------------
+
+    def _append(self, ids, vectors: np.ndarray, ref_doc_ids, metadata):
+        if self._dim is None:
+            self._dim = vectors.shape[1]
+        elif vectors.shape[1] != self._dim:
+            raise ValueError(f"Embedding dim {vectors.shape[1]} does not match store dim {self._dim}")
+        self._tail.append(_normalize(vectors))
+        self._stacked = None
+        self._ids.extend(ids)
+        self._ref_doc_ids.extend(ref_doc_ids)
+        self._metadata.extend(metadata)
+
+    def add(self, nodes: List[BaseNode], **add_kwargs: Any) -> List[str]:
+        if not nodes:
+            return []
+        self._append(
+            [node.node_id for node in nodes],
+            np.asarray([node.get_embedding() for node in nodes], dtype=np.float32),
+            [node.ref_doc_id for node in nodes],
+            [node.metadata or {} for node in nodes],
+        )
+        return [node.node_id for node in nodes]
+
+    def delete(self, ref_doc_id: str, **delete_kwargs: Any) -> None:
+        # Tombstone now, drop the rows on the next persist
+        for row, doc_id in enumerate(self._ref_doc_ids):
+            if doc_id == ref_doc_id:
+                self._deleted.add(row)
+        self._stacked = None
+
+    def persist(self, persist_path: str = os.path.join("./storage", DEFAULT_STORE_NAME), fs: Any = None) -> None:
+        base = _store_base(persist_path)
+        os.makedirs(os.path.dirname(base) or ".", exist_ok=True)
+
+        same_file = self._disk_base == os.path.abspath(base) and os.path.exists(base + MATRIX_SUFFIX)
+        too_sparse = len(self._deleted) > COMPACT_RATIO * max(len(self._ids), 1)
+        ann = self._ann
+        had_ann = ann is not None or os.path.exists(base + ANN_SUFFIX)
+        if same_file and not too_sparse:
+            self._persist_delta(base)
+            stale_ann = ann is not None and len(self._ids) - ann.n_rows > ANN_REBUILD_RATIO * ann.n_rows
+        else:
+            # Compaction renumbers rows, so any ANN index on disk no longer matches
+            if os.path.exists(base + ANN_SUFFIX):
+                os.remove(base + ANN_SUFFIX)
+            self._persist_full(base)
+            stale_ann = had_ann
+
+        # Re-open from disk so the persisted rows are paged in lazily again
+        fresh = type(self).from_persist_path(base)
+        self._matrix, self._tail, self._stacked = fresh._matrix, [], None
+        self._ids, self._ref_doc_ids, self._metadata = fresh._ids, fresh._ref_doc_ids, fresh._metadata
+        self._deleted, self._disk_base, self._disk_rows = fresh._deleted, fresh._disk_base, fresh._disk_rows
+        self._ann = fresh._ann
+        if stale_ann and self._ids:
+            self.build_ann(nprobe=ann.nprobe if ann is not None else DEFAULT_NPROBE)
+
+    def build_ann(self, nlist: Optional[int] = None, nprobe: int = DEFAULT_NPROBE, iters: int = 10) -> IVFIndex:
+        matrix = self._vectors()
+        if matrix is None:
+            raise ValueError("Cannot build an ANN index over an empty store")
+        self._ann = IVFIndex.build(matrix, nlist=nlist, nprobe=nprobe, iters=iters)
+        if self._disk_base is not None:
+            self._ann.save(self._disk_base + ANN_SUFFIX)
+        return self._ann
+
+    def _persist_delta(self, base: str):
+        # Append only the rows added since load; deletions stay as tombstones in the sidecar
+        if self._tail:
+            with open(base + MATRIX_SUFFIX, "r+b") as f:
+                # Seek by row count rather than EOF so a torn earlier write gets overwritten
+                f.seek(self._disk_rows * self._dim * 4)
+                for block in self._tail:
+                    f.write(np.ascontiguousarray(block, dtype=np.float32).tobytes())
+                f.truncate()
+        self._write_meta(base, range(len(self._ids)), deleted=sorted(self._deleted))
+
+    def _persist_full(self, base: str):
+        keep = [row for row in range(len(self._ids)) if row not in self._deleted]
+        matrix = self._vectors()
+        if matrix is not None and len(keep) != len(self._ids):
+            matrix = matrix[keep]
+
+        # Write to a temp file and swap in, so readers never see a half-written store
+        tmp_matrix = base + MATRIX_SUFFIX + ".tmp"
+        with open(tmp_matrix, "wb") as f:
+            if matrix is not None:
+                f.write(np.ascontiguousarray(matrix, dtype=np.float32).tobytes())
+        os.replace(tmp_matrix, base + MATRIX_SUFFIX)
+        self._write_meta(base, keep, deleted=[])
+
+    def _write_meta(self, base: str, rows, deleted: list):
+        meta = {
+            "version": 1,
+            "dim": self._dim,
+            "ids": [self._ids[row] for row in rows],
+            "ref_doc_ids": [self._ref_doc_ids[row] for row in rows],
+            "metadata": [self._metadata[row] for row in rows],
+            "deleted": deleted,
+        }
+        tmp_meta = base + META_SUFFIX + ".tmp"
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_meta, base + META_SUFFIX)
+
+    # --------------------
+    # Reads
+    # --------------------
+
+    def _vectors(self) -> Optional[np.ndarray]:
+        if not self._tail:
+            return self._matrix
+        if self._stacked is None:
+            parts = ([self._matrix] if self._matrix is not None else []) + self._tail
+            self._stacked = np.vstack(parts)
+        return self._stacked
+
+    def _row_mask(self, query: VectorStoreQuery) -> Optional[np.ndarray]:
+        n = len(self._ids)
+        if not (self._deleted or query.node_ids or query.doc_ids or query.filters):
+            return None
+
+        mask = np.ones(n, dtype=bool)
+        if self._deleted:
+            mask[list(self._deleted)] = False
+        if query.node_ids:
+            wanted = set(query.node_ids)
+            mask &= np.fromiter((i in wanted for i in self._ids), dtype=bool, count=n)
+        if query.doc_ids:
+            wanted = set(query.doc_ids)
+            mask &= np.fromiter((d in wanted for d in self._ref_doc_ids), dtype=bool, count=n)
+        if query.filters:
+            mask &= np.fromiter((_matches(m, query.filters) for m in self._metadata), dtype=bool, count=n)
+        return mask
+
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        if query.mode != VectorStoreQueryMode.DEFAULT:
+            raise ValueError(f"MmapVectorStore only supports dense queries, got mode={query.mode}")
+
+        matrix = self._vectors()
+        if matrix is None or query.query_embedding is None:
+            return VectorStoreQueryResult(nodes=[], similarities=[], ids=[])
+
+        q = _normalize(np.asarray(query.query_embedding, dtype=np.float32))
+        mask = self._row_mask(query)
+        k = query.similarity_top_k
+
+        if self.use_ann and self._ann is not None:
+            rows = self._ann.candidates(q)
+            if len(self._ids) > self._ann.n_rows:
+                # Rows appended after the index was built are not in any list yet
+                rows = np.concatenate([rows, np.arange(self._ann.n_rows, len(self._ids))])
+            if mask is not None:
+                rows = rows[mask[rows]]
+            # Too few candidates survive the filters: fall through to the exact scan
+            if len(rows) >= k:
+                rows.sort()  # sequential page access on the memmap
+                return self._top_k(rows, np.asarray(matrix[rows]) @ q, k)
+
+        rows = np.arange(len(self._ids)) if mask is None else np.flatnonzero(mask)
+        scores = matrix @ q
+        return self._top_k(rows, scores if mask is None else scores[rows], k)
+
+    def _top_k(self, rows: np.ndarray, scores: np.ndarray, k: int) -> VectorStoreQueryResult:
+        k = min(k, len(rows))
+        if k <= 0:
+            return VectorStoreQueryResult(nodes=[], similarities=[], ids=[])
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return VectorStoreQueryResult(
+            similarities=[float(scores[i]) for i in top],
+            ids=[self._ids[rows[i]] for i in top],
+        )
+
+
+def _matches(metadata: dict, filters: MetadataFilters) -> bool:
+    results = []
+    for f in filters.filters:
+        if isinstance(f, MetadataFilters):
+            results.append(_matches(metadata, f))
+            continue
+        value = metadata.get(f.key)
+        if f.operator == FilterOperator.EQ:
+            results.append(value == f.value)
+        elif f.operator == FilterOperator.NE:
+            results.append(value != f.value)
+        elif f.operator == FilterOperator.IN:
+            results.append(value in f.value)
+        elif f.operator == FilterOperator.NIN:
+            results.append(value not in f.value)
+        else:
+            raise ValueError(f"Unsupported metadata filter operator for MmapVectorStore: {f.operator}")
+    if filters.condition == FilterCondition.OR:
+        return any(results)
+    return all(results)
+
+
+def has_mmap_store(persist_dir: str) -> bool:
+    return os.path.exists(os.path.join(persist_dir, DEFAULT_STORE_NAME + MATRIX_SUFFIX))
+
+
+def load_storage_context(persist_dir: str = "./storage") -> StorageContext:
+    # Prefer the binary store when present, otherwise fall back to llama_index's JSON store
+    if has_mmap_store(persist_dir):
+        vector_store = MmapVectorStore.from_persist_dir(persist_dir)
+        return StorageContext.from_defaults(persist_dir=persist_dir, vector_store=vector_store)
+    return StorageContext.from_defaults(persist_dir=persist_dir)
+
+
+def convert_json_store(persist_dir: str = "./storage", remove_json: bool = False) -> MmapVectorStore:
+    json_path = os.path.join(persist_dir, DEFAULT_STORE_NAME + ".json")
+    store = MmapVectorStore.from_json_store(json_path)
+    store.persist(os.path.join(persist_dir, DEFAULT_STORE_NAME))
+    if remove_json:
+        os.remove(json_path)
+    return store
+
+
+if __name__ == "__main__":
+    # python mmap_vector_store.py [persist_dir] [--remove-json]
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    target = args[0] if args else "./storage"
+    converted = convert_json_store(target, remove_json="--remove-json" in sys.argv)
+    print(f"✅ Converted {converted.count} embeddings in {target} to {DEFAULT_STORE_NAME}{MATRIX_SUFFIX}")
@@ -0,0 +1,408 @@
+# ollama_client.py
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterator, Optional
+
+import httpx
+
+from llm_cache import LLMCache, default_llm_cache, request_key
+
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+# Generation can legitimately take minutes on CPU; connecting should not
+DEFAULT_TIMEOUT = httpx.Timeout(connect=5.0, read=float(os.getenv("OLLAMA_READ_TIMEOUT", "300")), write=30.0, pool=60.0)
+DEFAULT_MODEL_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "2"))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class OllamaError(Exception):
+    pass
+
+
+@dataclass
+class StreamStats:
+    model: str
+    ttft: Optional[float] = None  # seconds from request to first token
+    seconds: float = 0.0
+    tokens: int = 0
+    prompt_tokens: int = 0
+    eval_seconds: Optional[float] = None  # Ollama's own generation time, from the final chunk
+    cached: bool = False
+
+    @property
+    def tokens_per_s(self) -> float:
+        # Wall-clock time after the first token is only a fallback: buffered streams arrive all at once
+        generating = self.eval_seconds if self.eval_seconds else self.seconds - (self.ttft or 0.0)
+        return self.tokens / generating if generating > 0 else 0.0
+
+    def __str__(self) -> str:
+        if self.cached:
+            return f"{self.model}: served from LLM cache"
+        ttft = f"{self.ttft:.2f}s" if self.ttft is not None else "n/a"
+        return f"{self.model}: TTFT {ttft}, {self.tokens} tokens in {self.seconds:.1f}s ({self.tokens_per_s:.1f} tok/s)"
+
+
+class _StreamAccumulator:
+    # Shared by the sync and async streams: parses Ollama's NDJSON chunks and times them
+    def __init__(self, model: str):
+        self.stats = StreamStats(model=model)
+        self.started = time.perf_counter()
+        self.chunks = 0
+
+    def feed(self, line: str) -> str:
+        if not line.strip():
+            return ""
+        data = json.loads(line)
+        if data.get("error"):
+            raise OllamaError(f"Ollama stream error: {data['error']}")
+        piece = data.get("message", {}).get("content", "")
+        if piece:
+            self.chunks += 1
+            if self.stats.ttft is None:
+                self.stats.ttft = time.perf_counter() - self.started
+        if data.get("done"):
+            self.stats.tokens = data.get("eval_count", self.chunks)
+            self.stats.prompt_tokens = data.get("prompt_eval_count", 0)
+            if data.get("eval_duration"):
+                self.stats.eval_seconds = data["eval_duration"] / 1e9
+        return piece
+
+    def finish(self):
+        self.stats.seconds = time.perf_counter() - self.started
+        if not self.stats.tokens:
+            self.stats.tokens = self.chunks
+
+
+class ChatStream:
+    """Iterate to receive text pieces as Ollama emits them; .stats is filled in when the stream ends."""
+
+    def __init__(self, client: "OllamaClient", payload: dict, cache_key: Optional[str] = None):
+        self._client = client
+        self._payload = payload
+        self._cache_key = cache_key
+        self.stats = StreamStats(model=payload["model"])
+
+    def __iter__(self) -> Iterator[str]:
+        model = self._payload["model"]
+        cached = self._client._cache_get(self._cache_key)
+        if cached is not None:
+            self.stats = StreamStats(model=model, ttft=0.0, cached=True)
+            yield cached
+            return
+
+        acc = _StreamAccumulator(model)
+        self.stats = acc.stats
+        parts = []
+        with self._client._semaphore(model):
+            with self._client._open_stream(self._payload) as response:
+                for line in response.iter_lines():
+                    piece = acc.feed(line)
+                    if piece:
+                        parts.append(piece)
+                        yield piece
+        acc.finish()
+        self._client._cache_put(self._cache_key, model, "".join(parts))
+
+
+class AsyncChatStream:
+    """Async-iterator flavour of ChatStream."""
+
+    def __init__(self, client: "OllamaClient", payload: dict, cache_key: Optional[str] = None):
+        self._client = client
+        self._payload = payload
+        self._cache_key = cache_key
+        self.stats = StreamStats(model=payload["model"])
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        model = self._payload["model"]
+        cached = self._client._cache_get(self._cache_key)
+        if cached is not None:
+            self.stats = StreamStats(model=model, ttft=0.0, cached=True)
+            yield cached
+            return
+
+        acc = _StreamAccumulator(model)
+        self.stats = acc.stats
+        parts = []
+        async with self._client._async_semaphore(model):
+            async with self._client._aopen_stream(self._payload) as response:
+                async for line in response.aiter_lines():
+                    piece = acc.feed(line)
+                    if piece:
+                        parts.append(piece)
+                        yield piece
+        acc.finish()
+        self._client._cache_put(self._cache_key, model, "".join(parts))
+
+
+async def _close_with_loop(client: httpx.AsyncClient):
+    # asyncio.run() closes every still-open async generator before it closes its loop. This one is
+    # started on the loop that owns `client` and uses that moment to close its connection pool,
+    # which can no longer be done once the loop is gone.
+    try:
+        yield
+    finally:
+        if not client.is_closed:
+            await client.aclose()
+
+
+class OllamaClient:
+    """Shared Ollama HTTP client: keep-alive pool, sync + asyncio APIs, per-model limits, retries."""
+
+    def __init__(self, base_url: str = OLLAMA_BASE_URL, timeout: httpx.Timeout = DEFAULT_TIMEOUT,
+                 max_connections: int = 16, max_retries: int = 3, backoff: float = 0.5,
+                 default_concurrency: int = DEFAULT_MODEL_CONCURRENCY, model_concurrency: Optional[dict] = None,
+                 cache: Optional[LLMCache] = None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.default_concurrency = default_concurrency
+        self.model_concurrency = dict(model_concurrency or {})
+        # None unless LLM_CACHE=1 (or a cache is passed in)
+        self.cache = cache or default_llm_cache()
+
+        self._client = httpx.Client(base_url=self.base_url, timeout=timeout, limits=self.limits)
+        self._lock = threading.Lock()
+        self._semaphores: dict[str, threading.BoundedSemaphore] = {}
+        # asyncio primitives are bound to the loop they were created on (asyncio.run makes a new one each time)
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_loop = None
+        self._async_semaphores: dict[str, asyncio.Semaphore] = {}
+        self._async_closer = None
+
+    # --------------------
+    # Concurrency limits
+    # --------------------
+
+    def _limit(self, model: str) -> int:
+        return self.model_concurrency.get(model, self.default_concurrency)
+
+    def _semaphore(self, model: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if model not in self._semaphores:
+                self._semaphores[model] = threading.BoundedSemaphore(self._limit(model))
+            return self._semaphores[model]
+
+    def _async_state(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._async_loop is not loop:
+                old_client, old_loop = self._async_client, self._async_loop
+                self._async_client = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=self.limits)
+                self._async_loop = loop
+                self._async_semaphores = {}
+                self._async_closer = _close_with_loop(self._async_client)
+                asyncio.ensure_future(self._async_closer.__anext__())
+                # A loop still running elsewhere can close its own pool; one that has finished
+                # normally did so already through _close_with_loop
+                if old_client is not None and not old_client.is_closed and old_loop is not None and old_loop.is_running():
+                    asyncio.run_coroutine_threadsafe(old_client.aclose(), old_loop)
+            return self._async_client
+
+    def _async_semaphore(self, model: str) -> asyncio.Semaphore:
+        if model not in self._async_semaphores:
+            self._async_semaphores[model] = asyncio.Semaphore(self._limit(model))
+        return self._async_semaphores[model]
+
+    # --------------------
+    # Requests
+    # --------------------
+
+    def _delay(self, attempt: int) -> float:
+        return self.backoff * (2 ** attempt) * (0.5 + random.random())
+
+    def _check(self, response: httpx.Response) -> dict:
+        if response.status_code >= 400:
+            raise OllamaError(f"Ollama returned {response.status_code}: {response.text[:300]}")
+        try:
+            return response.json()
+        except ValueError as e:
+            raise OllamaError(f"Ollama returned invalid JSON: {response.text[:300]}") from e
+
+    def post(self, path: str, payload: dict, model: Optional[str] = None) -> dict:
+        model = model or payload.get("model", "")
+        with self._semaphore(model):
+            for attempt in range(self.max_retries + 1):
+                try:
+                    response = self._client.post(path, json=payload)
+                    if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                        return self._check(response)
+                except httpx.TransportError as e:
+                    if attempt == self.max_retries:
+                        raise OllamaError(f"Error connecting to Ollama at {self.base_url}: {e}") from e
+                time.sleep(self._delay(attempt))
+
+    async def apost(self, path: str, payload: dict, model: Optional[str] = None) -> dict:
+        model = model or payload.get("model", "")
+        client = self._async_state()
+        async with self._async_semaphore(model):
+            for attempt in range(self.max_retries + 1):
+                try:
+                    response = await client.post(path, json=payload)
+                    if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                        return self._check(response)
+                except httpx.TransportError as e:
+                    if attempt == self.max_retries:
+                        raise OllamaError(f"Error connecting to Ollama at {self.base_url}: {e}") from e
+                await asyncio.sleep(self._delay(attempt))
+
+    @contextmanager
+    def _open_stream(self, payload: dict):
+        # Retries only cover getting the stream started; a half-read stream is not replayed
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self._client.send(self._client.build_request("POST", "/api/chat", json=payload), stream=True)
+            except httpx.TransportError as e:
+                if attempt == self.max_retries:
+                    raise OllamaError(f"Error connecting to Ollama at {self.base_url}: {e}") from e
+                time.sleep(self._delay(attempt))
+                continue
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                response.close()
+                time.sleep(self._delay(attempt))
+                continue
+            break
+        try:
+            if response.status_code >= 400:
+                response.read()
+                self._check(response)
+            yield response
+        except httpx.TransportError as e:
+            # Timeouts or a dropped connection while the caller reads the stream
+            raise OllamaError(f"Ollama stream from {self.base_url} broke off: {e}") from e
+        finally:
+            response.close()
+
+    @asynccontextmanager
+    async def _aopen_stream(self, payload: dict):
+        client = self._async_state()
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await client.send(client.build_request("POST", "/api/chat", json=payload), stream=True)
+            except httpx.TransportError as e:
+                if attempt == self.max_retries:
+                    raise OllamaError(f"Error connecting to Ollama at {self.base_url}: {e}") from e
+                await asyncio.sleep(self._delay(attempt))
+                continue
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                await response.aclose()
+                await asyncio.sleep(self._delay(attempt))
+                continue
+            break
+        try:
+            if response.status_code >= 400:
+                await response.aread()
+                self._check(response)
+            yield response
+        except httpx.TransportError as e:
+            raise OllamaError(f"Ollama stream from {self.base_url} broke off: {e}") from e
+        finally:
+            await response.aclose()
+
+    # --------------------
+    # Chat API
+    # --------------------
+
+    def _cache_key(self, payload: dict, use_cache: Optional[bool]) -> Optional[str]:
+        # use_cache=True forces caching even for sampled calls, False skips the cache entirely
+        if self.cache is None or use_cache is False:
+            return None
+        options = payload.get("options") or {}
+        if use_cache is not True and not self.cache.should_cache(options.get("temperature")):
+            return None
+        params = {k: v for k, v in payload.items() if k not in ("model", "messages", "stream")}
+        return request_key(payload["model"], payload["messages"], params)
+
+    def _cache_get(self, key: Optional[str]) -> Optional[str]:
+        return self.cache.get(key) if key is not None else None
+
+    def _cache_put(self, key: Optional[str], model: str, content: str):
+        if key is not None and content:
+            self.cache.put(key, model, content)
+
+    @staticmethod
+    def _chat_payload(model: str, messages: list, options: Optional[dict], **extra) -> dict:
+        payload = {"model": model, "messages": messages, "stream": False, **extra}
+        if options:
+            payload["options"] = options
+        return payload
+
+    def chat(self, model: str, messages: list, options: Optional[dict] = None,
+             use_cache: Optional[bool] = None, **extra) -> str:
+        payload = self._chat_payload(model, messages, options, **extra)
+        key = self._cache_key(payload, use_cache)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        content = self.post("/api/chat", payload).get("message", {}).get("content", "")
+        self._cache_put(key, model, content)
+        return content
+
+    async def achat(self, model: str, messages: list, options: Optional[dict] = None,
+                    use_cache: Optional[bool] = None, **extra) -> str:
+        payload = self._chat_payload(model, messages, options, **extra)
+        key = self._cache_key(payload, use_cache)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        content = (await self.apost("/api/chat", payload)).get("message", {}).get("content", "")
+        self._cache_put(key, model, content)
+        return content
+
+    def stream_chat(self, model: str, messages: list, options: Optional[dict] = None,
+                    use_cache: Optional[bool] = None, **extra) -> ChatStream:
+        payload = self._chat_payload(model, messages, options, **extra)
+        payload["stream"] = True
+        return ChatStream(self, payload, cache_key=self._cache_key(payload, use_cache))
+
+    def astream_chat(self, model: str, messages: list, options: Optional[dict] = None,
+                     use_cache: Optional[bool] = None, **extra) -> AsyncChatStream:
+        payload = self._chat_payload(model, messages, options, **extra)
+        payload["stream"] = True
+        return AsyncChatStream(self, payload, cache_key=self._cache_key(payload, use_cache))
+
+    def close(self):
+        self._client.close()
+
+    async def aclose(self):
+        with self._lock:
+            client, self._async_client, self._async_loop = self._async_client, None, None
+        if client is not None:
+            await client.aclose()
+
+
+_default_client: Optional[OllamaClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_client() -> OllamaClient:
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = OllamaClient()
+        return _default_client
+
+
+def user_message(prompt: str) -> list:
+    return [{"role": "user", "content": prompt}]
+
+
+# --------------------
+# Framework clients, configured from the same place
+# --------------------
+
+def crew_llm(model: str = "qwen:7b", **kwargs):
+    from crewai import LLM
+    return LLM(model=f"ollama/{model}", base_url=OLLAMA_BASE_URL, timeout=DEFAULT_TIMEOUT.read, **kwargs)
+
+
+def chat_ollama(model: str = "phi3:mini", **kwargs):
+    from langchain_ollama import ChatOllama
+    return ChatOllama(model=model, base_url=OLLAMA_BASE_URL, **kwargs)
@@ -0,0 +1,183 @@
+# page_cache.py
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import requests
+
+PAGE_CACHE_PATH = os.getenv("PAGE_CACHE_PATH", ".cache/pages.sqlite")
+# Pages younger than this are served without touching the network
+PAGE_CACHE_MAX_AGE = float(os.getenv("PAGE_CACHE_MAX_AGE", "3600"))
+# PAGE_CACHE_OFFLINE=1 never hits the network: cached pages only, misses are errors
+PAGE_CACHE_OFFLINE = os.getenv("PAGE_CACHE_OFFLINE", "0") == "1"
+
+
+class PageCacheMiss(Exception):
+    """Raised in offline mode when a URL has never been fetched."""
+
+
+@dataclass
+class CachedPage:
+    url: str
+    content: bytes
+    status: int
+    # "fresh" (within max-age), "revalidated" (304), "fetched", "stale" (network failed) or "offline"
+    source: str
+
+    @property
+    def from_cache(self) -> bool:
+        return self.source != "fetched"
+
+
+def url_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+class PageCache:
+    """SQLite store of raw page bodies plus validators, revalidated with conditional GETs."""
+
+    def __init__(self, path: str = PAGE_CACHE_PATH, max_age: float = PAGE_CACHE_MAX_AGE,
+                 offline: bool = PAGE_CACHE_OFFLINE):
+        self.path = path
+        self.max_age = max_age
+        self.offline = offline
+        self.counts = {"fresh": 0, "revalidated": 0, "fetched": 0, "stale": 0, "offline": 0}
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL;")
+        self._conn.execute("PRAGMA busy_timeout=5000;")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def lookup(self, url: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM pages WHERE key = ?", (url_key(url),)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"body": row[0], "etag": row[1], "last_modified": row[2], "fetched_at": row[3]}
+
+    def store(self, url: str, body: bytes, etag: Optional[str], last_modified: Optional[str]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (key, url, body, etag, last_modified, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url_key(url), url, body, etag, last_modified, time.time()),
+            )
+            self._conn.commit()
+
+    def touch(self, url: str):
+        with self._lock:
+            self._conn.execute("UPDATE pages SET fetched_at = ? WHERE key = ?", (time.time(), url_key(url)))
+            self._conn.commit()
+
+    # Shared by the sync and async fetch paths; returns a page when no request is needed
+    def _before_request(self, url: str, entry: Optional[dict]) -> tuple[Optional[CachedPage], dict]:
+        if self.offline:
+            if entry is None:
+                raise PageCacheMiss(f"{url} is not in the page cache (offline mode)")
+            return self._hit(url, entry, "offline"), {}
+        if entry is not None and time.time() - entry["fetched_at"] < self.max_age:
+            return self._hit(url, entry, "fresh"), {}
+        conditional = {}
+        if entry is not None:
+            if entry["etag"]:
+                conditional["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                conditional["If-Modified-Since"] = entry["last_modified"]
+        return None, conditional
+
+    def _after_response(self, url: str, entry: Optional[dict], status: int, body: bytes, headers) -> CachedPage:
+        if status == 304 and entry is not None:
+            self.touch(url)
+            return self._hit(url, entry, "revalidated")
+        if status == 200 and "no-store" not in headers.get("Cache-Control", ""):
+            self.store(url, body, headers.get("ETag"), headers.get("Last-Modified"))
+        self.counts["fetched"] += 1
+        return CachedPage(url=url, content=body, status=status, source="fetched")
+
+    def _hit(self, url: str, entry: dict, source: str) -> CachedPage:
+        self.counts[source] += 1
+        return CachedPage(url=url, content=entry["body"], status=200, source=source)
+
+    def fetch(self, url: str, headers: Optional[dict] = None, timeout: float = 15,
+              session: Optional[requests.Session] = None) -> CachedPage:
+        entry = self.lookup(url)
+        page, conditional = self._before_request(url, entry)
+        if page is not None:
+            return page
+        try:
+            response = (session or requests).get(url, headers={**(headers or {}), **conditional}, timeout=timeout)
+        except requests.exceptions.RequestException:
+            if entry is None:
+                raise
+            return self._hit(url, entry, "stale")
+        if response.status_code >= 500 and entry is not None:
+            # An origin outage is no reason to drop a copy we already have
+            return self._hit(url, entry, "stale")
+        if response.status_code != 304:
+            response.raise_for_status()
+        return self._after_response(url, entry, response.status_code, response.content, response.headers)
+
+    async def afetch(self, client, url: str) -> CachedPage:
+        # client is an httpx.AsyncClient; kept untyped so this module doesn't require httpx
+        import httpx
+
+        # SQLite calls go to a thread so they don't block the event loop
+        entry = await asyncio.to_thread(self.lookup, url)
+        page, conditional = self._before_request(url, entry)
+        if page is not None:
+            return page
+        try:
+            response = await client.get(url, headers=conditional)
+        except httpx.TransportError:
+            if entry is None:
+                raise
+            return self._hit(url, entry, "stale")
+        if response.status_code >= 500 and entry is not None:
+            return self._hit(url, entry, "stale")
+        if response.status_code != 304:
+            response.raise_for_status()
+        return await asyncio.to_thread(
+            self._after_response, url, entry, response.status_code, response.content, response.headers
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        return {**self.counts, "entries": entries, "offline_mode": self.offline}
+
+
+_default_cache: Optional[PageCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def default_page_cache() -> PageCache:
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = PageCache()
+        return _default_cache
+
+
+def fetch_page(url: str, headers: Optional[dict] = None, timeout: float = 15) -> CachedPage:
+    return default_page_cache().fetch(url, headers=headers, timeout=timeout)
@@ -1,39 +1,46 @@
-from llama_index.core import VectorStoreIndex, StorageContext, load_index_from_storage
+import sys
+from llama_index.core import load_index_from_storage
 from llama_index.llms.huggingface import HuggingFaceLLM
 from llama_index.embeddings.huggingface import HuggingFaceEmbedding
-from transformers import AutoModelForCausalLM, AutoTokenizer, pipeline
-
-# Set up local HuggingFace embedding model (instead of OpenAI)
+from transformers import AutoModelForCausalLM, AutoTokenizer
+from mmap_vector_store import load_storage_context
+from embedding_cache import CachedEmbedding
 from llama_index.core import Settings
-Settings.embed_model = HuggingFaceEmbedding(model_name="sentence-transformers/all-MiniLM-L6-v2")
-
-# Load TinyLlama model and tokenizer for local generation
-model_id = "TinyLlama/TinyLlama-1.1B-Chat-v1.0"
-tokenizer = AutoTokenizer.from_pretrained(model_id)
-model = AutoModelForCausalLM.from_pretrained(model_id, device_map="cpu")
-
-# Build generation pipeline
-hf_pipeline = pipeline(
-    "text-generation",
-    model=model,
-    tokenizer=tokenizer,
-    max_new_tokens=256,
-)
-
-# Register the HuggingFace pipeline as your LLM
-Settings.llm = HuggingFaceLLM(
-    model=model,
-    tokenizer=tokenizer,
-    max_new_tokens=256,
-)
-
-# Load the index from disk
-storage_context = StorageContext.from_defaults(persist_dir="./storage")
-index = load_index_from_storage(storage_context)
-
-# Create a query engine
-query_engine = index.as_query_engine()
-
-# Ask your question
-response = query_engine.query("What is the relationship between Stoicism and AI?")
-print(response)
\ No newline at end of file
+
+MODEL_ID = "TinyLlama/TinyLlama-1.1B-Chat-v1.0"
+EMBED_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+DEFAULT_QUESTION = "What is the relationship between Stoicism and AI?"
+
+
+def setup_models():
+    # Set up local HuggingFace embedding model (instead of OpenAI), with repeated queries served from disk
+    Settings.embed_model = CachedEmbedding(HuggingFaceEmbedding(model_name=EMBED_MODEL_NAME))
+
+    # Load TinyLlama model and tokenizer for local generation
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_ID)
+    model = AutoModelForCausalLM.from_pretrained(MODEL_ID, device_map="cpu")
+
+    # Register the HuggingFace model as your LLM
+    Settings.llm = HuggingFaceLLM(
+        model=model,
+        tokenizer=tokenizer,
+        max_new_tokens=256,
+    )
+
+
+def load_query_engine(persist_dir="./storage"):
+    # Uses the mmap float32 store if build_index.py wrote one, otherwise the JSON store
+    storage_context = load_storage_context(persist_dir)
+    index = load_index_from_storage(storage_context)
+    return index.as_query_engine()
+
+
+# One-shot mode; for many questions run query_server.py, which loads all of this once
+if __name__ == "__main__":
+    setup_models()
+    query_engine = load_query_engine("./storage")
+
+    # Ask your question
+    question = " ".join(sys.argv[1:]) or DEFAULT_QUESTION
+    response = query_engine.query(question)
+    print(response)
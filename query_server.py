@@ -0,0 +1,209 @@
+# query_server.py
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from llama_index.core import Settings
+from llama_index.core.schema import QueryBundle
+
+HOST = os.getenv("QUERY_SERVER_HOST", "127.0.0.1")
+PORT = int(os.getenv("QUERY_SERVER_PORT", "8765"))
+PERSIST_DIR = os.getenv("QUERY_SERVER_PERSIST_DIR", "./storage")
+# TinyLlama on CPU can't usefully run two generations at once
+GENERATION_SLOTS = int(os.getenv("QUERY_SERVER_GENERATION_SLOTS", "1"))
+DEFAULT_URL = f"http://{HOST}:{PORT}"
+
+
+class LatencyTracker:
+    def __init__(self, window: int = 1000):
+        self._samples: dict[str, deque] = {}
+        self._window = window
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(stage, deque(maxlen=self._window)).append(seconds)
+
+    def summary(self) -> dict:
+        with self._lock:
+            snapshot = {stage: sorted(samples) for stage, samples in self._samples.items()}
+        out = {}
+        for stage, samples in snapshot.items():
+            pick = lambda p: samples[min(len(samples) - 1, int(p * len(samples)))] * 1000
+            out[stage] = {
+                "count": len(samples),
+                "p50_ms": round(pick(0.50), 1),
+                "p90_ms": round(pick(0.90), 1),
+                "p99_ms": round(pick(0.99), 1),
+                "max_ms": round(samples[-1] * 1000, 1),
+            }
+        return out
+
+
+class QuestionBatcher:
+    """Collects questions arriving within a few ms and embeds them in one forward pass."""
+
+    def __init__(self, embed_model, max_batch: int = 16, max_wait: float = 0.005):
+        self.embed_model = embed_model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batch_sizes = deque(maxlen=1000)
+        self._queue: queue.Queue = queue.Queue()
+        threading.Thread(target=self._loop, name="question-batcher", daemon=True).start()
+
+    def embed(self, question: str) -> list:
+        future: Future = Future()
+        self._queue.put((question, future))
+        return future.result()
+
+    def _loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            questions = [q for q, _ in batch]
+            try:
+                if hasattr(self.embed_model, "get_query_embedding_batch"):
+                    vectors = self.embed_model.get_query_embedding_batch(questions)
+                else:
+                    vectors = [self.embed_model.get_query_embedding(q) for q in questions]
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batch_sizes.append(len(batch))
+            for (_, future), vector in zip(batch, vectors):
+                future.set_result(vector)
+
+
+class QueryService:
+    def __init__(self, persist_dir: str = PERSIST_DIR):
+        # Heavy imports + model loads happen exactly once, when the server starts
+        from query_index import setup_models
+        from index_cache import index_cache
+
+        started = time.perf_counter()
+        setup_models()
+        self.persist_dir = persist_dir
+        self.index_cache = index_cache
+        self.index_cache.get_query_engine(persist_dir)
+        self.batcher = QuestionBatcher(Settings.embed_model)
+        self.latency = LatencyTracker()
+        self.generation_slots = threading.BoundedSemaphore(GENERATION_SLOTS)
+        self.startup_seconds = time.perf_counter() - started
+
+    def answer(self, question: str) -> dict:
+        t0 = time.perf_counter()
+        embedding = self.batcher.embed(question)
+        t1 = time.perf_counter()
+
+        # Cached engine; reloads by itself if build_index.py rewrote the store
+        query_engine = self.index_cache.get_query_engine(self.persist_dir)
+        bundle = QueryBundle(query_str=question, embedding=embedding)
+        nodes = query_engine.retrieve(bundle)
+        t2 = time.perf_counter()
+
+        with self.generation_slots:
+            response = query_engine.synthesize(bundle, nodes)
+        t3 = time.perf_counter()
+
+        self.latency.record("embed", t1 - t0)
+        self.latency.record("retrieve", t2 - t1)
+        self.latency.record("generate", t3 - t2)
+        self.latency.record("total", t3 - t0)
+        return {
+            "answer": str(response),
+            "sources": [
+                {"node_id": n.node.node_id, "score": n.score, "file_name": n.node.metadata.get("file_name")}
+                for n in nodes
+            ],
+            "latency_ms": round((t3 - t0) * 1000, 1),
+        }
+
+    def stats(self) -> dict:
+        sizes = list(self.batcher.batch_sizes)
+        stats = {
+            "latency": self.latency.summary(),
+            "startup_seconds": round(self.startup_seconds, 2),
+            "embed_batches": len(sizes),
+            "avg_embed_batch": round(sum(sizes) / len(sizes), 2) if sizes else 0.0,
+            "index_cache": self.index_cache.stats.as_dict(),
+        }
+        if hasattr(Settings.embed_model, "cache"):
+            stats["embedding_cache"] = Settings.embed_model.cache.stats()
+        return stats
+
+
+def make_handler(service: QueryService):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload: dict):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, {"status": "healthy"})
+            elif self.path == "/stats":
+                self._send(200, service.stats())
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/query":
+                self._send(404, {"error": "not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                question = json.loads(self.rfile.read(length) or b"{}").get("question", "").strip()
+            except (ValueError, AttributeError):
+                self._send(400, {"error": "expected a JSON body like {\"question\": \"...\"}"})
+                return
+            if not question:
+                self._send(400, {"error": "question is required"})
+                return
+            try:
+                self._send(200, service.answer(question))
+            except Exception as e:
+                self._send(500, {"error": str(e)})
+
+        def log_message(self, format, *args):
+            pass  # per-request access logs would dominate the console; see /stats instead
+
+    return Handler
+
+
+def ask(question: str, url: str = DEFAULT_URL, timeout: float = 300) -> str:
+    response = requests.post(f"{url}/query", json={"question": question}, timeout=timeout)
+    response.raise_for_status()
+    return response.json()["answer"]
+
+
+if __name__ == "__main__":
+    print("🧠 Loading models and index...")
+    service = QueryService()
+    server = ThreadingHTTPServer((HOST, PORT), make_handler(service))
+    print(f"✅ Query server ready on {DEFAULT_URL} (loaded in {service.startup_seconds:.1f}s)")
+    print("   POST /query {\"question\": \"...\"} · GET /stats · GET /health")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down")
+        server.server_close()
@@ -1,6 +1,18 @@
 from cort_tool import CoRTTool
+from cort_worker import get_worker
 
 tool = CoRTTool()
 query = "What is the meaning of life?"
 print(tool.run(query))
 print("Done running CoRT tool.")
+
+# Same worker, streaming the intermediate rounds
+for event in get_worker().stream("Name one mindful habit for heavy phone users."):
+    if event["event"] == "round":
+        print(f"🔁 Round {event['round']}: picked {event['chosen'] or 'current'} "
+              f"(score {event['score']}) — {event['reason']}")
+    elif event["event"] == "result":
+        print(f"✅ {event['rounds']} rounds, {event['calls']} calls, stopped: {event['stopped']}")
+        print(event["answer"])
+    elif event["event"] == "error":
+        print("❌", event["error"])
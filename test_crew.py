@@ -2,12 +2,12 @@
 import os
 os.environ["DISABLE_TELEMETRY"] = "true"  # 👈 Disable telemetry timeout
 
-from crewai import Agent, Task, Crew, LLM
+from crewai import Agent, Task, Crew
+from ollama_client import crew_llm
 
 # Use CrewAI's LLM class
-llm = LLM(
-    model="ollama/qwen:7b",
-    base_url="http://localhost:11434",
+llm = crew_llm(
+    "qwen:7b",
     temperature=0.7,
     max_tokens=512
 )
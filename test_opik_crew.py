@@ -2,23 +2,19 @@ from dotenv import load_dotenv
 import os
 from opik import track
 from crewai import Crew, Agent, Task
-from litellm import completion
+from ollama_client import get_client
 
 # Load environment variables
 load_dotenv()
 
 # ✅ Define a wrapper class with a `.call()` method
 class OllamaLLMWrapper:
-    def __init__(self, model="ollama/llama3"):
+    def __init__(self, model="llama3"):
         self.model = model
 
     def call(self, messages, **kwargs):
-        response = completion(
-            model=self.model,
-            messages=messages,
-            api_base="http://localhost:11434",  # Local Ollama
-        )
-        return response["choices"][0]["message"]["content"]
+        # Local Ollama through the shared pooled client
+        return get_client().chat(self.model, messages)
 
 # ✅ Pass the wrapper into the agent
 local_llm = OllamaLLMWrapper()
@@ -2,8 +2,10 @@
 from langchain_core.tools import StructuredTool
 from pydantic import BaseModel, Field
 import requests
-from bs4 import BeautifulSoup
 from crewai.tools import BaseTool
+from batch_scraper import HEADERS, normalize_url, scrape_many
+from html_extract import extract_text
+from page_cache import PageCacheMiss, fetch_page
 
 class ScrapeWebsiteInput(BaseModel):
     url: str = Field(..., description="The URL to scrape. Must be a valid http or https link.")
@@ -15,37 +17,32 @@ class CustomScrapeWebsiteTool(BaseTool):
 
     def _run(self, url: str) -> str:
         try:
-            # Clean and validate URL
-            url = url.strip().split()[0]
-            if not url.startswith("http"):
-                url = "https://" + url
+            url = normalize_url(url)
 
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
-            }
+            page = fetch_page(url, headers=HEADERS, timeout=15)
 
-            response = requests.get(url, headers=headers, timeout=15)
-            response.raise_for_status()
+            return extract_text(page.content)
 
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Remove unwanted elements
-            for element in soup(["script", "style", "nav", "footer", "aside", "header", "form"]):
-                element.decompose()
-
-            # Extract readable text
-            content = "\n".join([
-                element.get_text(strip=True)
-                for element in soup.find_all(["p", "h1", "h2", "h3"])
-                if len(element.get_text(strip=True)) > 20
-            ])
-
-            return content[:4000]  # Return top 4000 chars
-
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, PageCacheMiss) as e:
             return f"Failed to fetch page: {str(e)}"
         except Exception as e:
             return f"Scraping error: {str(e)}"
 
-# Instantiate the tool
+class BatchScrapeInput(BaseModel):
+    urls: list[str] = Field(..., description="The URLs to scrape. Each must be a valid http or https link.")
+
+class BatchScrapeWebsiteTool(BaseTool):
+    name: str = "Read many websites"
+    description: str = "Use this to scrape several websites at once when researching mindful tech practices."
+    args_schema: type[BaseModel] = BatchScrapeInput
+
+    def _run(self, urls: list[str]) -> str:
+        sections = []
+        for result in scrape_many(urls):
+            body = result.content if result.ok else f"Failed to fetch page: {result.error}"
+            sections.append(f"## {result.url}\n{body}")
+        return "\n\n".join(sections)
+
+# Instantiate the tools
 scrape_tool = CustomScrapeWebsiteTool()
+batch_scrape_tool = BatchScrapeWebsiteTool()
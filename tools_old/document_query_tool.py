@@ -1,14 +1,14 @@
 # tools/document_query_tool.py
 from crewai_tools import BaseTool
-from llama_index.core import StorageContext, load_index_from_storage
+from index_cache import index_cache
 
 class LocalDocQueryTool(BaseTool):
     name = "Local Document Knowledge Search"
     description = "Searches indexed knowledge from local documents"
+    persist_dir: str = "llamaindex/vector_store"
 
     def _run(self, query: str) -> str:
-        storage_context = StorageContext.from_defaults(persist_dir="llamaindex/vector_store")
-        index = load_index_from_storage(storage_context)
-        query_engine = index.as_query_engine()
+        # Index + query engine are loaded once per process and reused until the store changes
+        query_engine = index_cache.get_query_engine(self.persist_dir)
         response = query_engine.query(query)
-        return str(response)
\ No newline at end of file
+        return str(response)